@@ -0,0 +1,83 @@
+import warnings
+
+
+def function_word_ords(ud_index, ud_node):
+    """
+    Returns the ords of the function words aligned to a UD node, looked up in the UDIndex of its tree:
+    auxiliary verbs, SCONJ marks, adpositions and articles.
+    """
+    # Alignment of auxiliary verbs to the main verb
+    ords = [c.ord for c in ud_index.group(ud_node, 'udeprel', 'aux')]
+    # Alignment of SCONJ marks to the main verb -- comment out next line not to align SCONJs
+    ords += [c.ord for c in ud_index.group(ud_node, 'udeprel', 'mark') if c.upos == 'SCONJ']
+    # Alignment of adpositions and articles to the parent noun; # comment out next lines not to align them
+    ords += [c.ord for c in ud_index.group(ud_node, 'udeprel', 'case')]
+    ords += [c.ord for c in ud_index.group(ud_node, 'udeprel', 'det') if c.feats['PronType'] == 'Art']
+    return ords
+
+
+def token_spans(ords):
+    """ Merges token ords into sorted (first, last) spans of consecutive tokens, e.g. [5, 1, 2] -> [(1, 2), (5, 5)]. """
+    if len(ords) == 1:
+        return [(ords[0], ords[0])]
+    ords = sorted(ords)
+    spans = []
+    start = end = ords[0]
+    for num in ords[1:]:
+        if num == end + 1:
+            end = num
+        elif num != end:
+            spans.append((start, end))
+            start = end = num
+    spans.append((start, end))
+    return spans
+
+
+class Alignment:
+    def __init__(self, spans, sent_id=None):
+        """
+        The alignment of the variables of a UMR graph to the tokens of its UD tree (see UMRGraph.alignment), shared by
+        the .umr and JSON Lines outputs.
+
+        Attributes:
+            self.spans (dict): variable -> sorted list of (first, last) token spans, ordered by first token; variables
+                not aligned to any token have the span (0, 0).
+            self.sent_id (str): The address of the UD tree, used in warnings.
+        """
+        self.spans = dict(sorted(spans.items(), key=lambda item: item[1][0][0]))
+        self.sent_id = sent_id
+
+    def __len__(self):
+        return len(self.spans)
+
+    def __iter__(self):
+        return iter(self.spans)
+
+    def __getitem__(self, var):
+        return self.spans[var]
+
+    def items(self):
+        return self.spans.items()
+
+    def shared_tokens(self):
+        """ Returns token -> variables, for the tokens (other than 0) aligned to more than one variable. """
+        tokens = [token for spans in self.spans.values() for start, end in spans
+                  for token in range(max(start, 1), end + 1)]
+        if len(tokens) == len(set(tokens)):
+            return {}
+
+        variables_by_token = {}
+        for var, spans in self.spans.items():
+            for start, end in spans:
+                for token in range(max(start, 1), end + 1):
+                    variables_by_token.setdefault(token, []).append(var)
+        return {token: variables for token, variables in variables_by_token.items() if len(variables) > 1}
+
+    def check(self):
+        """ Raises a warning if there are two UMR nodes aligned to the same token. """
+        for token, variables in self.shared_tokens().items():
+            warnings.warn(f"[Warning] Two variables aligned to the same token: {variables} in sentence {self.sent_id}")
+
+    def lines(self):
+        """ Returns the alignment block of the .umr output, as a list of 'variable: first-last, ...' lines. """
+        return [f"{var}: {', '.join(f'{start}-{end}' for start, end in spans)}" for var, spans in self.spans.items()]
@@ -0,0 +1,60 @@
+import gzip
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024  # bytes
+COMPRESSED_SUFFIX = '.gz'
+
+
+def encode_block(block) -> bytes:
+    """ Encodes the block of a sentence as written to the output, so that workers can hand over finished bytes. """
+    return block.encode('utf-8')
+
+
+class BlockWriter:
+    def __init__(self, path, compress=False, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Writes the blocks of the converted sentences to the output file, buffering them so that the file is written in
+        large chunks instead of once per sentence. With compress, the output is gzip-compressed.
+
+        Blocks are written as bytes (see encode_block), or as strings, which are encoded when written.
+
+        Attributes:
+            self.path (str): The path of the output file.
+            self.chunk_size (int): The number of bytes buffered before they are written to the file.
+            self.buffer (bytearray): The bytes not written yet.
+            self.blocks (int): The number of blocks written so far.
+        """
+        self.path = path
+        self.chunk_size = chunk_size
+        self.buffer = bytearray()
+        self.blocks = 0
+        self.file = gzip.open(path, 'wb') if compress else open(path, 'wb')
+
+    def write(self, block):
+        self.buffer += block if isinstance(block, bytes) else encode_block(block)
+        self.blocks += 1
+        if len(self.buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.file.write(self.buffer)
+            self.buffer.clear()
+        self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_text(path):
+    """ Opens an output of the converter for reading, decompressing it if its name ends with COMPRESSED_SUFFIX. """
+    if path.endswith(COMPRESSED_SUFFIX):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
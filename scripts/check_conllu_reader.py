@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Checks that the streaming CoNLL-U reader (conllu_reader) and the sent_id index (conllu_index) read the same sentences
+as udapi.Document, with the same addresses: blocks made only of comment lines must be skipped without taking up a
+sentence number.
+
+    python3 scripts/check_conllu_reader.py
+    python3 scripts/check_conllu_reader.py --treebank cs_pud-ud-test.conllu
+
+A small fixture is always checked; with --treebank, the given treebank is checked as well, followed by a block made
+only of a comment. Exits with status 1 if the sentences differ.
+"""
+import os
+import sys
+import argparse
+import tempfile
+import udapi
+from conllu_reader import read_sentences, tree_from_lines
+from conllu_index import ConlluIndex
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--treebank", help="Name of an input treebank to check as well.")
+parser.add_argument("--data_dir",
+                    help="Path of the directory where the input treebanks are stored, if not 'data'.", default='./data')
+
+# Sentences without sent_id, a block with only a comment in between, and one at the end.
+FIXTURE = ('# text = one\n1\tone\tone\tNUM\t_\t_\t0\troot\t_\t_\n\n'
+           '# just a comment\n\n'
+           '# text = two\n1\ttwo\ttwo\tNUM\t_\t_\t0\troot\t_\t_\n\n'
+           '# sent_id = s3\n# text = three\n1\tthree\tthree\tNUM\t_\t_\t0\troot\t_\t_\n\n'
+           '# trailing comment\n\n')
+TRAILING_COMMENT = '\n# trailing comment\n\n'
+
+
+def streamed_addresses(path):
+    """ Returns the addresses of the trees read one sentence at a time, as main.py does. """
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        return [tree_from_lines(lines, sent_num).address() for sent_num, lines in enumerate(read_sentences(f), start=1)]
+
+
+def indexed_addresses(path):
+    """ Returns the sent_ids of the index of the file, in the order of the file. """
+    return ConlluIndex(path, save=False).in_file_order()
+
+
+def check(name, text):
+    """ Compares the sentences read by udapi, by the streaming reader and by the index; True if they are the same. """
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'check.conllu')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        expected = [tree.address() for tree in udapi.Document(path).trees]
+        read = {'streaming reader': streamed_addresses(path), 'index': indexed_addresses(path)}
+
+    same = True
+    for reader, addresses in read.items():
+        if addresses != expected:
+            first = next((i for i, (a, b) in enumerate(zip(expected, addresses)) if a != b),
+                         min(len(expected), len(addresses)))
+            print(f"{name}: {len(addresses)} sentences read by the {reader} instead of {len(expected)} (first "
+                  f"difference at sentence {first + 1}).")
+            same = False
+    if same:
+        print(f"{name}: {len(expected)} sentences read, as by udapi.")
+    return same
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+
+    inputs = [('fixture', FIXTURE)]
+    if args.treebank:
+        with open(os.path.join(args.data_dir, args.treebank), 'r', encoding='utf-8-sig') as f:
+            inputs.append((args.treebank, f.read().rstrip('\n') + '\n' + TRAILING_COMMENT))
+
+    if not all([check(name, text) for name, text in inputs]):
+        sys.exit(1)
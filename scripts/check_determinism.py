@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Checks that the conversion is deterministic: converts a treebank several times, each time with a different string
+hashing seed (PYTHONHASHSEED), and compares the outputs byte by byte.
+
+    python3 scripts/check_determinism.py --treebank en_example.conllu --lang en
+
+Exits with status 1 if the outputs differ, reporting the first sentence that differs.
+"""
+import os
+import sys
+import argparse
+import subprocess
+import tempfile
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--treebank", help="Name of the input treebank.", required=True)
+parser.add_argument("--lang", help="Language code of the treebank (e.g., 'en' for English).", required=True)
+parser.add_argument("--data_dir",
+                    help="Path of the directory where the input treebanks are stored, if not 'data'.", default='./data')
+parser.add_argument("--seeds", help="The PYTHONHASHSEED values to compare (default: 0 1 2).", nargs='+',
+                    default=['0', '1', '2'])
+
+MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'main.py')
+
+
+def convert(treebank, lang, data_dir, seed, output_dir) -> bytes:
+    """ Runs the converter with the given hash seed and returns its output. """
+    env = dict(os.environ, PYTHONHASHSEED=seed)
+    subprocess.run([sys.executable, MAIN, '--treebank', treebank, '--lang', lang, '--data_dir', data_dir,
+                    '--output_dir', output_dir], env=env, check=True, stdout=subprocess.DEVNULL)
+    with open(os.path.join(output_dir, f"{treebank.split('.')[0]}.umr"), 'rb') as f:
+        return f.read()
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        outputs = {seed: convert(args.treebank, args.lang, args.data_dir, seed, os.path.join(tmp, seed))
+                   for seed in args.seeds}
+
+    reference_seed, reference = next(iter(outputs.items()))
+    for seed, output in outputs.items():
+        if output != reference:
+            sentences = zip(reference.split(b'#' * 80), output.split(b'#' * 80))
+            first = next((i for i, (a, b) in enumerate(sentences) if a != b), None)
+            print(f"Outputs with PYTHONHASHSEED={reference_seed} and {seed} differ (first at sentence {first}).")
+            sys.exit(1)
+
+    print(f"Identical outputs with PYTHONHASHSEED in {', '.join(args.seeds)}.")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Checks that penman_serializer.encode() gives the same output as penman.encode(..., indent=4), on the graphs converted
+from a treebank and optionally on random graphs, which also cover the cases where penman raises a LayoutError.
+With --legacy, checks instead that UMRGraph.to_penman() gives the same triples and root as to_penman(legacy=True),
+i.e. that the fused post-processing passes are equivalent to the original sequence, on the graphs of a treebank.
+
+    python3 scripts/check_equivalence.py --treebank en_example.conllu --lang en
+    python3 scripts/check_equivalence.py --treebank en_example.conllu --lang en --random 30000
+    python3 scripts/check_equivalence.py --treebank en_example.conllu --lang en --legacy
+
+Exits with status 1 if some graphs differ, reporting the first ones.
+"""
+import sys
+import random
+import argparse
+import penman
+from penman.exceptions import LayoutError
+import penman_serializer
+from main import build_graph, load_resources, treebank_sentences
+from conllu_reader import tree_from_lines
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--treebank", help="Name of the input treebank.", required=True)
+parser.add_argument("--lang", help="Language code of the treebank (e.g., 'en' for English).", required=True)
+parser.add_argument("--data_dir",
+                    help="Path of the directory where the input treebanks are stored, if not 'data'.", default='./data')
+parser.add_argument("--var_naming", help="The naming convention for variable names (default: 'first').",
+                    choices=['first', 'x'], default='first')
+parser.add_argument("--random", help="Number of random graphs to check as well (default: 0).", type=int, default=0)
+parser.add_argument("--seed", help="Seed of the random graphs (default: 1).", type=int, default=1)
+parser.add_argument("--legacy", help="Compare to_penman() with to_penman(legacy=True) instead of the serializer with "
+                                     "penman.", action='store_true')
+
+REPORTED = 3  # number of differences printed
+
+
+def converted_graphs(treebank, lang, data_dir, var_naming, legacy=False):
+    """
+    Yields the address, triples and root of the graph of each sentence of the treebank, post-processed by the legacy
+    passes if legacy is True (see UMRGraph.to_penman).
+    """
+    resources = load_resources(lang)
+    for sent_num, lines in enumerate(treebank_sentences(treebank, data_dir), start=1):
+        tree = tree_from_lines(lines, sent_num)
+        triples, root = build_graph(tree, sent_num, lang, var_naming, resources).to_penman(legacy=legacy)
+        yield tree.address(), triples, root
+
+
+def check_legacy(treebank, lang, data_dir, var_naming):
+    """ Compares the graphs post-processed by the fused and by the legacy passes; returns the number of differences. """
+    graphs = differences = 0
+    for (name, triples, root), (_, legacy_triples, legacy_root) in zip(
+            converted_graphs(treebank, lang, data_dir, var_naming),
+            converted_graphs(treebank, lang, data_dir, var_naming, legacy=True)):
+        graphs += 1
+        if (triples, root) != (legacy_triples, legacy_root):
+            differences += 1
+            if differences <= REPORTED:
+                print(f"{name}:\n{root} {triples}\n--- legacy:\n{legacy_root} {legacy_triples}\n")
+
+    print(f"{graphs} graphs checked, {differences} different.")
+    return differences
+
+
+def random_graphs(number, seed):
+    """ Yields random graphs, with dangling variables, missing concepts and disconnected parts. """
+    rng = random.Random(seed)
+    for n in range(number):
+        variables = [f'v{i}' for i in range(rng.randint(1, 7))]
+        triples = []
+        for _ in range(rng.randint(0, 14)):
+            k = rng.random()
+            source = rng.choice(variables)
+            if k < .3:
+                triples.append((source, 'instance', rng.choice(['c', 'd', '', None])))
+            elif k < .8:
+                triples.append((source, rng.choice(['ARG0', 'ARG1-of', 'mod', 'op1']), rng.choice(variables + ['z'])))
+            else:
+                triples.append((source, 'quant', rng.choice([0, 3, '"x"', None])))
+        yield f'random graph {n}', triples, rng.choice(variables + [None])
+
+
+def encode_both(triples, top):
+    """ Returns the output (or the error) of penman.encode() and of penman_serializer.encode() for the graph. """
+    outputs = []
+    for encode in (lambda: penman.encode(penman.Graph([(s, f':{r}', t) for s, r, t in triples]), top=top, indent=4),
+                   lambda: penman_serializer.encode(triples, top, indent=4, strict=True)[0]):
+        try:
+            outputs.append(encode())
+        except LayoutError as e:
+            outputs.append(f'LayoutError: {e}')
+        except Exception as e:
+            outputs.append(type(e).__name__)
+    return outputs
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    if args.legacy and args.random:
+        parser.error("--random cannot be used with --legacy")
+    if args.legacy:
+        sys.exit(1 if check_legacy(args.treebank, args.lang, args.data_dir, args.var_naming) else 0)
+
+    graphs = differences = errors = 0
+    sources = [converted_graphs(args.treebank, args.lang, args.data_dir, args.var_naming)]
+    if args.random:
+        sources.append(random_graphs(args.random, args.seed))
+
+    for source in sources:
+        for name, triples, top in source:
+            if not triples:
+                continue
+            graphs += 1
+            reference, output = encode_both(triples, top)
+            errors += reference.startswith('LayoutError')
+            if reference != output:
+                differences += 1
+                if differences <= REPORTED:
+                    print(f"{name}:\n{reference}\n--- penman_serializer:\n{output}\n")
+
+    print(f"{graphs} graphs checked ({errors} with a LayoutError), {differences} different.")
+    if differences:
+        sys.exit(1)
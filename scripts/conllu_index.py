@@ -0,0 +1,147 @@
+import os
+import mmap
+import pickle
+from array import array
+from bisect import bisect_left
+from udapi.block.read.conllu import RE_SENT_ID
+
+INDEX_SUFFIX = '.sentidx'
+BOM = b'\xef\xbb\xbf'
+
+
+def index_sentences(path) -> dict:
+    """
+    Scans a CoNLL-U file once and returns sent_id -> (byte offset, byte length) of each sentence, in the order of the
+    file. Sentences are delimited as in conllu_reader.read_sentences(), and blocks made only of comment lines are
+    skipped likewise; sentences without sent_id are indexed by their position (as udapi numbers them), and only the
+    first of several sentences with the same sent_id is indexed.
+    """
+    offsets = {}
+    position = 0
+    start = sent_id = None
+    has_tokens = False
+    offset = 0
+
+    with open(path, 'rb') as f:
+        for line in f:
+            if line.strip():
+                if start is None:
+                    start, sent_id, has_tokens = offset, None, False
+                if not line.startswith((b'#', BOM + b'#')):
+                    if not has_tokens:
+                        has_tokens = True
+                        position += 1
+                elif sent_id is None:
+                    match = RE_SENT_ID.match(line.removeprefix(BOM).decode('utf-8').rstrip())
+                    if match:
+                        sent_id = match.group(1)
+            elif start is not None:
+                if has_tokens:
+                    offsets.setdefault(sent_id or str(position), (start, offset - start))
+                start = None
+            offset += len(line)
+
+    if start is not None and has_tokens:
+        offsets.setdefault(sent_id or str(position), (start, offset - start))
+    return offsets
+
+
+class ConlluIndex:
+    # Bump when the index changes, to invalidate existing index files.
+    INDEX_VERSION = 2
+
+    def __init__(self, path, save=True):
+        """
+        A random-access index of the sentences of a CoNLL-U file, by sent_id, so that a few sentences can be read
+        without loading the whole treebank.
+
+        The index is built once and saved next to the file (as <file>.sentidx); it is reused as long as the
+        modification time and size of the file do not change. If it cannot be written, the index is just not saved.
+
+        Attributes:
+            self.path (str): The path of the CoNLL-U file.
+            self.stamp (tuple): (mtime_ns, size) of the file when it was indexed.
+            self.ids (list[str]): The sorted sent_ids of the file, looked up by binary search.
+            self.offsets (array): The byte offset of each sentence, in the order of self.ids.
+            self.lengths (array): The byte length of each sentence, in the order of self.ids.
+
+        Args:
+            path (str): The path of the CoNLL-U file.
+            save (bool): Whether to reuse and save the index file.
+        """
+        self.path = path
+        stat = os.stat(path)
+        self.stamp = (stat.st_mtime_ns, stat.st_size)
+        self.ids, self.offsets, self.lengths = [], array('q'), array('q')
+
+        if not (save and self.load()):
+            spans = index_sentences(path)
+            self.ids = sorted(spans)
+            self.offsets = array('q', (spans[sent_id][0] for sent_id in self.ids))
+            self.lengths = array('q', (spans[sent_id][1] for sent_id in self.ids))
+            if save:
+                self.save()
+
+    @property
+    def index_path(self):
+        return f'{self.path}{INDEX_SUFFIX}'
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, sent_id):
+        return self.find(sent_id) is not None
+
+    def find(self, sent_id):
+        """ Returns the position of sent_id in self.ids, or None if it is not in the file. """
+        i = bisect_left(self.ids, sent_id)
+        return i if i < len(self.ids) and self.ids[i] == sent_id else None
+
+    def load(self):
+        """ Loads the index file, if it is up to date. Returns True on success. """
+        try:
+            with open(self.index_path, 'rb') as f:
+                index = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return False
+        if index.get('version') != self.INDEX_VERSION or index.get('stamp') != self.stamp:
+            return False
+        self.ids, self.offsets, self.lengths = index['ids'], index['offsets'], index['lengths']
+        return True
+
+    def save(self):
+        """ Saves the index file, atomically; does nothing if the directory is not writable. """
+        index = {'version': self.INDEX_VERSION, 'stamp': self.stamp, 'ids': self.ids, 'offsets': self.offsets,
+                 'lengths': self.lengths}
+        temporary = f'{self.index_path}.{os.getpid()}'
+        try:
+            with open(temporary, 'wb') as f:
+                pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, self.index_path)
+        except OSError:
+            pass
+
+    def in_file_order(self):
+        """ Returns the sent_ids of the file, in the order of the file. """
+        return [self.ids[i] for i in sorted(range(len(self.ids)), key=self.offsets.__getitem__)]
+
+    def select(self, sent_ids):
+        """ Returns the positions in self.ids of the given sent_ids that are in the file, in the order of the file. """
+        found = {self.find(sent_id) for sent_id in sent_ids} - {None}
+        return sorted(found, key=lambda i: self.offsets[i])
+
+    def sentences(self, sent_ids):
+        """
+        Yields the CoNLL-U lines of the sentences with the given sent_ids, in the order of the file, as
+        conllu_reader.read_sentences() does. Only the requested sentences are read, from a memory map of the file.
+        Sentence ids that are not in the file are skipped (see select()).
+        """
+        selected = self.select(sent_ids)
+        if not selected:
+            return
+
+        with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for i in selected:
+                offset = self.offsets[i]
+                text = data[offset:offset + self.lengths[i]].decode('utf-8-sig')
+                yield [line for line in (line.rstrip() for line in text.split('\n')) if line]
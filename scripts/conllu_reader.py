@@ -0,0 +1,63 @@
+from udapi.block.read.conllu import Conllu, RE_SENT_ID
+from udapi.core.document import Document
+
+_reader = Conllu()
+
+
+def read_sentences(filehandle):
+    """
+    Yields the CoNLL-U lines of each sentence in the input, one sentence at a time.
+    Sentences are separated by (one or more) empty lines, as in udapi. Blocks made only of comment lines are skipped,
+    as udapi does, so they do not take up a sentence number.
+
+    Args:
+        filehandle: an open text file (or any iterable of lines) in CoNLL-U format.
+    """
+    lines = []
+    has_tokens = False
+    for line in filehandle:
+        line = line.rstrip()
+        if line:
+            lines.append(line)
+            has_tokens = has_tokens or not line.startswith('#')
+        elif lines:
+            if has_tokens:
+                yield lines
+            lines, has_tokens = [], False
+    if has_tokens:
+        yield lines
+
+
+def tree_from_lines(lines, bundle_id):
+    """
+    Builds a Udapi tree from the CoNLL-U lines of a single sentence.
+    The tree is attached to its own bundle, so that tree.address() returns the sent_id, as when the whole treebank is
+    loaded in a udapi.Document.
+
+    Args:
+        lines (list[str]): The CoNLL-U lines of the sentence (comments included).
+        bundle_id (str): The id to use if the sentence has no sent_id (udapi numbers bundles progressively).
+    """
+    root = _reader.read_tree_from_lines(lines)
+    bundle = Document().create_bundle()
+    if root._sent_id is not None:
+        parts = root._sent_id.split('/', 1)
+        bundle.bundle_id = parts[0]
+        if len(parts) == 2:
+            root.zone = parts[1]
+    else:
+        bundle.bundle_id = str(bundle_id)
+    bundle.add_tree(root)
+    return root
+
+
+def sentence_id(lines, bundle_id):
+    """
+    Returns the address that tree_from_lines(lines, bundle_id).address() would return, without building the tree:
+    the sent_id of the sentence, or bundle_id if it has none.
+    """
+    for line in lines:
+        match = RE_SENT_ID.match(line)
+        if match:
+            return match.group(1)
+    return str(bundle_id)
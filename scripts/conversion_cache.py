@@ -0,0 +1,164 @@
+import os
+import re
+import glob
+import hashlib
+from functools import lru_cache
+from udapi.block.read.conllu import RE_SENT_ID
+
+# Stands for the sentence number in cached blocks: variables are stored as 's\x00a', the header as '# :: snt\x00'.
+PLACEHOLDER = '\x00'
+DEFAULT_MAX_SIZE = 512 * 1024 * 1024  # bytes
+
+# Quoted constants are matched first, so that variable-like text inside them is left untouched.
+GRAPH_TOKEN = r'"(?:[^"\\]|\\.)*"|(?<=[(\s])(s%d)([^\W\d_]\d*)(?=[\s)]|\Z)'
+
+
+@lru_cache(maxsize=None)
+def converter_version() -> str:
+    """ Returns a hash of the converter's source code, so that cached conversions are invalidated by any change. """
+    sha = hashlib.sha256()
+    for path in sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), '*.py'))):
+        with open(path, 'rb') as f:
+            sha.update(os.path.basename(path).encode() + b'\0' + f.read())
+    return sha.hexdigest()
+
+
+def abstract_block(block, sent_num):
+    """
+    Replaces the sentence number in the block printed for a sentence (see print_structure) with PLACEHOLDER, i.e. in
+    the '# :: snt' line and in the 's{sent_num}' prefix of the variables of the graph and of the alignments.
+    Returns None if the block cannot be abstracted safely, i.e. if it already contains PLACEHOLDER.
+    """
+    if PLACEHOLDER in block:
+        return None
+
+    head, graph_header, rest = block.partition('# sentence level graph:\n')
+    head = head.replace(f'\n# :: snt{sent_num}\n', f'\n# :: snt{PLACEHOLDER}\n', 1)
+    graph, alignment_header, tail = rest.partition('\n# alignment:\n')
+
+    token = re.compile(GRAPH_TOKEN % sent_num)
+    variables = {m.group(1) + m.group(2) for m in token.finditer(graph)
+                 if m.group(1) and m.start() > 0 and graph[m.start() - 1] == '('}
+
+    def replace(m):
+        if not m.group(1) or m.group(1) + m.group(2) not in variables or graph[max(m.start() - 2, 0):m.start()] == '/ ':
+            return m.group(0)
+        return f's{PLACEHOLDER}{m.group(2)}'
+
+    graph = token.sub(replace, graph)
+
+    alignments, document_header, tail = tail.partition('\n# document level annotation:')
+    lines = []
+    for line in alignments.split('\n'):
+        var, colon, aligned = line.partition(':')
+        if colon and var in variables:
+            line = f's{PLACEHOLDER}{var[len(str(sent_num)) + 1:]}{colon}{aligned}'
+        lines.append(line)
+
+    return ''.join((head, graph_header, graph, alignment_header, '\n'.join(lines), document_header, tail))
+
+
+def render_block(template, sent_num) -> str:
+    """ Fills in the sentence number of a block abstracted by abstract_block(). """
+    return template.replace(PLACEHOLDER, str(sent_num))
+
+
+class ConversionCache:
+    def __init__(self, directory, max_size=DEFAULT_MAX_SIZE):
+        """
+        An on-disk cache of converted sentences, addressed by the content of their input (see key()).
+        Each entry is the block printed for a sentence, with the sentence number abstracted out (see abstract_block()),
+        so that it can be reused for the same tree at any position in a treebank.
+
+        The cache is bounded in size: when it grows beyond max_size, the least recently used entries are removed.
+        Entries are touched when they are read, so that their modification time records their last use.
+        Reading is safe from several processes; entries should be added from a single process.
+
+        Attributes:
+            self.directory (str): The directory of the cache; entries are stored in subdirectories by key prefix.
+            self.max_size (int): The maximum total size of the entries, in bytes.
+            self.size (int): The total size of the entries, computed on the first insertion.
+        """
+        self.directory = directory
+        self.max_size = max_size
+        self.size = None
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(lines, position, language, var_naming, numerals, resources) -> str:
+        """
+        Returns the key of a sentence: a hash of its CoNLL-U lines and of everything else its conversion depends on,
+        i.e. the language, the variable naming, the numeral backend, the lexical resources (a digest, see
+        preprocess.ResourceBundle.digest) and the converter version. Sentences without sent_id are identified by their
+        position, which then appears in the output.
+        """
+        sha = hashlib.sha256()
+        for part in (converter_version(), language, var_naming, numerals, resources):
+            sha.update(part.encode() + b'\0')
+        if not any(RE_SENT_ID.match(line) for line in lines):
+            sha.update(f'position={position}'.encode() + b'\0')
+        sha.update('\n'.join(lines).encode())
+        return sha.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], f'{key[2:]}.umr')
+
+    def get(self, key):
+        """ Returns the template stored under key, or None. """
+        path = self.path(key)
+        try:
+            with open(path, 'r', encoding='utf-8', newline='') as f:
+                template = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        return template
+
+    def put(self, key, template):
+        """ Stores a template under key (atomically), evicting the least recently used entries if needed. """
+        if template is None:
+            return
+        path = self.path(key)
+        temporary = f'{path}.{os.getpid()}'
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(temporary, 'w', encoding='utf-8', newline='') as f:
+                f.write(template)
+            os.replace(temporary, path)
+        except OSError:
+            return
+
+        if self.size is None:
+            self.size = sum(size for _, size, _ in self.entries())
+        else:
+            self.size += os.path.getsize(path)
+        if self.size > self.max_size:
+            self.evict()
+
+    def entries(self):
+        """ Returns the (path, size, modification time) of all the entries. """
+        entries = []
+        for subdirectory in os.scandir(self.directory):
+            if not subdirectory.is_dir():
+                continue
+            for entry in os.scandir(subdirectory.path):
+                if entry.name.endswith('.umr'):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((entry.path, stat.st_size, stat.st_mtime_ns))
+        return entries
+
+    def evict(self):
+        """ Removes the least recently used entries, until the cache is down to 90% of its maximum size. """
+        entries = sorted(self.entries(), key=lambda entry: entry[2])
+        self.size = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if self.size <= 0.9 * self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self.size -= size
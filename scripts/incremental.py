@@ -0,0 +1,65 @@
+import re
+from conversion_cache import abstract_block, render_block
+from block_writer import open_text
+
+SEPARATOR = '#' * 80
+INPUT_HASH = '# meta-info :: input_hash = '
+
+_SENT_ID_LINE = re.compile(r'^# meta-info :: sent_id = (.*)$', re.MULTILINE)
+_INPUT_HASH_LINE = re.compile(rf'^{re.escape(INPUT_HASH)}(\S*)\n', re.MULTILINE)
+_SENT_NUM_LINE = re.compile(r'^# :: snt(\d+)$', re.MULTILINE)
+
+
+def add_input_hash(block, key):
+    """ Adds the input hash of a sentence (see ConversionCache.key) to its block, after the sent_id line. """
+    match = _SENT_ID_LINE.search(block)
+    if not match or key is None:
+        return block
+    return f'{block[:match.end() + 1]}{INPUT_HASH}{key}\n{block[match.end() + 1:]}'
+
+
+class PreviousOutput:
+    def __init__(self, path):
+        """
+        Index of a previous output of the converter, whose sentences can be reused by an incremental conversion.
+        Only sentences printed with their input hash (--input_hashes) can be reused.
+
+        The whole file is read when the index is built, so the previous output can be overwritten by the new one.
+        Compressed outputs (--compress) are decompressed on the fly.
+
+        Attributes:
+            self.blocks (dict): sent_id -> (input hash, sentence number, block without the input hash line).
+            self.reused (int): The number of sentences reused so far.
+        """
+        self.blocks = {}
+        self.reused = 0
+
+        with open_text(path) as f:
+            text = f.read()
+
+        for chunk in text.split(SEPARATOR)[1:]:
+            block = SEPARATOR + chunk
+            sent_id, input_hash, sent_num = (_SENT_ID_LINE.search(block), _INPUT_HASH_LINE.search(block),
+                                              _SENT_NUM_LINE.search(block))
+            if sent_id and input_hash and sent_num:
+                self.blocks[sent_id.group(1)] = (input_hash.group(1), int(sent_num.group(1)),
+                                                 block[:input_hash.start()] + block[input_hash.end():])
+
+    def __len__(self):
+        return len(self.blocks)
+
+    def reuse(self, sent_id, key, sent_num):
+        """
+        Returns the previous block of the sentence, renumbered as sentence sent_num, if the sentence was printed with
+        the same input hash; otherwise None.
+        """
+        input_hash, previous_num, block = self.blocks.get(sent_id, (None, None, None))
+        if key is None or input_hash != key:
+            return None
+        if previous_num != sent_num:
+            template = abstract_block(block, previous_num)
+            if template is None:
+                return None
+            block = render_block(template, sent_num)
+        self.reused += 1
+        return block
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark of print_structure.index_and_word_lines(), which builds the `Index` and `Words` lines of each sentence,
+against the previous implementation (which re-joined the index line once per padding space).
+
+    python3 scripts/line_benchmark.py
+    python3 scripts/line_benchmark.py --files testset/gold_total_cs_test.txt --scale 4
+
+Sentences are taken from the `Words:` lines of the given UMR files (by default, the files in testset/). With --scale,
+each sentence is repeated to simulate longer ones. Both implementations are checked to give identical lines.
+"""
+import os
+import glob
+import timeit
+import argparse
+from print_structure import index_and_word_lines
+
+TESTSET = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'testset')
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--files", help="UMR files to take the sentences from (default: testset/*.txt).", nargs='+',
+                    default=sorted(glob.glob(os.path.join(TESTSET, '*.txt'))))
+parser.add_argument("--scale", help="Number of times each sentence is repeated (default: 1).", type=int, default=1)
+parser.add_argument("--number", help="Number of runs over all the sentences (default: 20).", type=int, default=20)
+
+
+def previous_index_and_word_lines(words):
+    """ The previous implementation, quadratic in the length of the index line. """
+    word_line = ''.join(
+        word + (' ' * 2 if len(word) == 1 and i > 9 else ' ')
+        for i, word in enumerate(words, start=1)
+    ).strip()
+
+    index_line_parts = []
+    current_pos = 0
+
+    for i, word in enumerate(words, start=1):
+        index_str = str(i)
+        while len(''.join(index_line_parts)) < current_pos:
+            index_line_parts.append(' ')
+        index_line_parts.append(index_str)
+        min_spacing = 1 if (len(word) > 1 or (len(word) == 1 and len(index_str) == 1)) else 2
+        current_pos += len(word) + min_spacing
+
+    return ''.join(index_line_parts), word_line
+
+
+def read_sentences(files):
+    """ Returns the tokens of the `Words:` lines of the given files. """
+    sentences = []
+    for path in files:
+        with open(path, 'r', encoding='utf-8') as f:
+            sentences.extend(line[len('Words:'):].split() for line in f if line.startswith('Words:'))
+    return sentences
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    sentences = [words * args.scale for words in read_sentences(args.files)]
+    if not sentences:
+        parser.error("no `Words:` lines found in the given files")
+
+    for words in sentences:
+        assert index_and_word_lines(words) == previous_index_and_word_lines(words), words
+
+    tokens = sum(map(len, sentences))
+    print(f"{len(sentences)} sentences, {tokens / len(sentences):.1f} tokens on average, {max(map(len, sentences))} at most")
+    for name, function in (('previous', previous_index_and_word_lines), ('current', index_and_word_lines)):
+        seconds = timeit.timeit(lambda: [function(words) for words in sentences], number=args.number)
+        print(f"{name:<10}{1e6 * seconds / (args.number * len(sentences)):>10.1f} µs/sentence")
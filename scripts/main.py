@@ -1,82 +1,295 @@
 #!/usr/bin/env python3
 # Copyright © 2025 Federica Gamba <gamba@ufal.mff.cuni.cz>
 
+import io
 import os
+import sys
 import argparse
-import udapi
-from umr_node import UMRNode
+from multiprocessing import Pool
+from umr_node import UMRNode, DISPATCHER
 from umr_graph import UMRGraph
 import preprocess as pr
-from print_structure import print_structure
+from print_structure import render_structure
+from conllu_reader import read_sentences, tree_from_lines, sentence_id
+from conllu_index import ConlluIndex
+from conversion_cache import ConversionCache, abstract_block, render_block
+from incremental import PreviousOutput, add_input_hash
+from block_writer import BlockWriter, encode_block, COMPRESSED_SUFFIX
+from umr_jsonl import render_record, add_record_hash
 
 parser = argparse.ArgumentParser()
-parser.add_argument("--treebank", help="Path of the treebank in input.", required=True)
+parser.add_argument("--treebank", help="Path of the treebank in input, or '-' to read it from the standard input.",
+                    required=True)
 parser.add_argument("--lang", help="Language code of the treebank (e.g., 'en' for English).", required=True)
 parser.add_argument("--data_dir",
                     help="Path of the directory where the input treebanks are stored, if not 'data'.", default='./data')
 parser.add_argument("--output_dir",
                     help="Path of the directory where converted UMRs are stored, if not 'output'.", default='./output')
+parser.add_argument("--sent_ids", "--sent-ids", metavar="FILE",
+                    help="Path of a file listing the sent_ids of the sentences to convert, one per line (default: all the "
+                         "sentences). Only these sentences are read, through an index of the treebank saved next to it "
+                         "as <treebank>.sentidx.")
 parser.add_argument("--var_naming",
                     help="Specify whether to use the first letter of the concept as the variable name (default), or use 'x' instead.",
                     choices=['first', 'x'], default='first')
+parser.add_argument("--workers",
+                    help="Number of processes converting sentences in parallel (default: 1, i.e. sequential conversion).",
+                    type=int, default=1)
+parser.add_argument("--resource_dir",
+                    help="Path of the directory where the language-specific lexical resources are stored, if not "
+                         "'external_resources'.", default=pr.DEFAULT_RESOURCE_DIR)
+parser.add_argument("--numerals",
+                    help="How non-English numerals written in words are converted to digits: with the offline lexicons in "
+                         "external_resources (default), or with Google Translate (requires network access).",
+                    choices=list(pr.NUMERAL_BACKENDS), default='lexicon')
+parser.add_argument("--cache_dir",
+                    help="Path of a directory where converted sentences are cached, to be reused when the same trees are "
+                         "converted again with the same options (default: no cache).")
+parser.add_argument("--cache_size",
+                    help="Maximum size of the cache in MB; the least recently used sentences are evicted (default: 512).",
+                    type=int, default=512)
+parser.add_argument("--input_hashes",
+                    help="Print the input hash of each sentence in its meta-info, so that the output can be passed to "
+                         "--incremental later on.", action='store_true')
+parser.add_argument("--incremental", metavar="PREVIOUS.umr",
+                    help="Path of a previous output of the converter (printed with --input_hashes): sentences whose "
+                         "input has not changed are copied from it instead of being converted again. Implies "
+                         "--input_hashes.")
+parser.add_argument("--format",
+                    help="Output format: UMR text files (default), or JSON Lines with one record per sentence (sent_id, "
+                         "text, root, triples and alignments; see scripts/umr_jsonl.py).",
+                    choices=['umr', 'jsonl'], default='umr')
+parser.add_argument("--compress",
+                    help="Write the output gzip-compressed, as <treebank>.umr.gz (or .jsonl.gz).", action='store_true')
+parser.add_argument("--profile_rules",
+                    help="Count and time the conversion rules applied to each node, and print a report at the end "
+                         "(sequential conversion only).", action='store_true')
 
 
-if __name__ == "__main__":
+# Renderers of the block of a sentence, by output format, and functions adding its input hash to the block.
+RENDERERS = {'umr': (render_structure, add_input_hash), 'jsonl': (render_record, add_record_hash)}
 
-    args = parser.parse_args()
-    doc = udapi.Document(f'{args.data_dir}/{args.treebank}')
-    sent_num = 0
 
-    interpersonal = pr.load_external_files('have_rel_role.txt', args.lang)
-    advcl = pr.load_external_files('advcl.csv', args.lang)
-    modals = pr.load_external_files('modality.json', args.lang)
-    conjunctions = pr.load_external_files('conj.json', args.lang)
+def load_resources(lang):
+    """
+    Load the language-specific lexical resources, in the order expected by UMRGraph.
+    Resources are loaded and indexed once per language (see preprocess.ResourceBundle), and shared by all the
+    UMRGraph instances.
+    """
+    return pr.load_bundle(lang).graph_resources()
 
-    # with open("testset/sent-ids_converted_70_test.txt", "r", encoding="utf8") as for_test_file:  # to produce the test set
-    # with open("testset/sent-ids_manual_30_test.txt", "r", encoding="utf8") as for_test_file:  # to produce the test set
-    #     test = for_test_file.read().splitlines()
 
-    os.makedirs(args.output_dir, exist_ok=True)
-    with open(os.path.join(args.output_dir, f"{args.treebank.split('.')[0]}.umr"), "w",  encoding="utf-8") as output:
-    # with open(f"testset/converted_{args.lang}_test.txt", "w", encoding="utf-8") as output:  # to produce the test set for annotation
-    # with open(f"testset/converter-output_30_{args.lang}_test.txt", "w", encoding="utf-8") as output:  # to produce the merged test set
+def build_graph(tree, sent_num, lang, var_naming, resources):
+    """
+    Convert a single UD tree into a UMRGraph, whose triples are then serialized by UMRGraph.to_penman().
+
+    Args:
+        tree: Udapi tree.
+        sent_num (int): The progressive number of the sentence, used as prefix of variable names.
+        lang (str): The language of the tree.
+        var_naming (str): The naming convention for variable names, either 'first' or 'x'.
+        resources (tuple): The lexical resources returned by load_resources().
+    """
+    roles = pr.classify_roles(tree.descendants)
+    sent_tree = UMRGraph(tree, sent_num, roles, lang, var_naming, *resources)
+
+    # First pass: create variables for UD nodes.
+    for node in tree.descendants:
+        if node.deprel not in ['aux', 'case', 'punct', 'mark']:
+            role = roles.get(node)
+            item = UMRNode(node, sent_tree, role=role)
+
+    # Second pass: assign initial parents after all nodes have been created.
+    for n in sent_tree.nodes:
+        parent = n.find_by_ud_node(sent_tree, n.ud_node.parent)
+        n.parent = parent[0] if parent else None
+
+    # Third pass: create relations between variables and build the UMR structure.
+    for n in sent_tree.nodes:
+        if not isinstance(n.ud_node, str):
+            n.ud_to_umr()
+
+    # Fourth pass: replace nodes that are supposed to correspond to a UMR entity (PRON, PROPN).
+    # They are processed separately to avoid clashes with layered constructions (e.g., abstract rolesets).
+    for n in sent_tree.nodes:
+        n.replace_entities()
+
+    return sent_tree
+
+
+def convert_tree(tree, sent_num, lang, var_naming, resources, output_format='umr') -> str:
+    """
+    Convert a single UD tree into a UMR graph and render it, together with its alignments.
+
+    Args:
+        tree: Udapi tree.
+        sent_num (int): The progressive number of the sentence, used as prefix of variable names.
+        lang (str): The language of the tree.
+        var_naming (str): The naming convention for variable names, either 'first' or 'x'.
+        resources (tuple): The lexical resources returned by load_resources().
+        output_format (str): The output format, either 'umr' or 'jsonl'.
+
+    Returns:
+        str: The block of the sentence (see print_structure.render_structure and umr_jsonl.render_record).
+    """
+    sent_tree = build_graph(tree, sent_num, lang, var_naming, resources)
+    umr, root = sent_tree.to_penman()
+
+    # Render the UMR structure
+    render, _ = RENDERERS[output_format]
+    return render(tree, sent_tree, umr, root, sent_num)
+
+
+def open_treebank(treebank, data_dir):
+    """ Open the input treebank for reading, or the standard input if the treebank is '-'. """
+    if treebank == '-':
+        return io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8-sig')
+    return open(f'{data_dir}/{treebank}', 'r', encoding='utf-8-sig')
+
+
+def treebank_sentences(treebank, data_dir):
+    """ Yield the CoNLL-U lines of all the sentences of the treebank, one sentence at a time. """
+    with open_treebank(treebank, data_dir) as conllu:
+        yield from read_sentences(conllu)
 
-        for tree in doc.trees:
 
-            # if tree.address() in test:
+def read_sent_ids(path):
+    """ Read the sent_ids listed in a file, one per line. """
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
 
-                sent_num += 1
 
-                deprels_to_relations = pr.get_deprels(tree)
-                sent_tree = UMRGraph(tree, sent_num, deprels_to_relations, args.lang, args.var_naming, interpersonal, advcl, modals, conjunctions)
+_worker_config = {}
 
-                # First pass: create variables for UD nodes.
-                for node in tree.descendants:
-                    if node.deprel not in ['aux', 'case', 'punct', 'mark']:
-                        role = pr.get_role_from_deprel(node, deprels_to_relations)
-                        item = UMRNode(node, sent_tree, role=role)
 
-                # Second pass: assign initial parents after all nodes have been created.
-                for n in sent_tree.nodes:
-                    parent = n.find_by_ud_node(sent_tree, n.ud_node.parent)
-                    n.parent = parent[0] if parent else None
+def init_worker(lang, var_naming, numerals, resource_dir, cache_dir=None, cache_size=512, input_hashes=False,
+                output_format='umr'):
+    """
+    Load the lexical resources once per worker process (or once in the main process, for sequential conversion),
+    and open the conversion cache, if any.
+    """
+    pr.use_resource_dir(resource_dir)
+    pr.use_numeral_backend(numerals)
+    _worker_config.update(lang=lang, var_naming=var_naming, resources=load_resources(lang), input_hashes=input_hashes,
+                          output_format=output_format,
+                          cache=ConversionCache(cache_dir, cache_size * 1024 * 1024) if cache_dir else None,
+                          cache_key=(lang, var_naming, numerals, pr.load_bundle(lang).digest))
 
-                # Third pass: create relations between variables and build the UMR structure.
-                for n in sent_tree.nodes:
-                    if not isinstance(n.ud_node, str):
-                        n.ud_to_umr()
 
-                # Fourth pass: replace nodes that are supposed to correspond to a UMR entity (PRON, PROPN).
-                # They are processed separately to avoid clashes with layered constructions (e.g., abstract rolesets).
-                for n in sent_tree.nodes:
-                    n.replace_entities()
+def sentence_tasks(sentences, keyed, previous=None):
+    """
+    Yields the conversion task of each sentence, given as (sentence number, CoNLL-U lines): the sentence number, the
+    lines, the input hash of the sentence (see ConversionCache.key) if keyed is True, and the block of the sentence
+    reused from the previous output, if any.
+    """
+    for sent_num, lines in sentences:
+        key = ConversionCache.key(lines, sent_num, *_worker_config['cache_key']) if keyed else None
+        reused = previous.reuse(sentence_id(lines, sent_num), key, sent_num) if previous else None
+        yield sent_num, lines, key, reused
+
+
+def convert_lines(task):
+    """
+    Worker task: convert one sentence given as CoNLL-U lines and return the UMR block, encoded as written to the
+    output (with its input hash, if requested), so that only finished bytes are sent back to the main process.
+    The sentence number is assigned by the main process, so that variable names match the sequential conversion.
+
+    Sentences reused from a previous output are returned as they are. If a conversion cache is in use, the block is
+    taken from the cache when possible; otherwise, the abstracted block to store in the cache is returned as well,
+    since entries are only added by the main process.
+
+    Args:
+        task (tuple): The sentence number, the CoNLL-U lines, the input hash and the reused block, as yielded by
+        sentence_tasks().
+
+    Returns:
+        tuple: The encoded block, the input hash and the block to store in the cache (None if nothing has to be
+        stored).
+    """
+    sent_num, lines, key, reused = task
+    block = template = None
+    cache = _worker_config['cache']
+
+    if reused is not None:
+        block = reused
+    elif cache:
+        cached = cache.get(key)
+        if cached is not None:
+            block = render_block(cached, sent_num)
+
+    if block is None:
+        tree = tree_from_lines(lines, sent_num)
+        block = convert_tree(tree, sent_num, _worker_config['lang'], _worker_config['var_naming'],
+                             _worker_config['resources'], _worker_config['output_format'])
+        template = abstract_block(block, sent_num) if cache else None
+
+    if _worker_config['input_hashes']:
+        _, add_hash = RENDERERS[_worker_config['output_format']]
+        block = add_hash(block, key)
+    return encode_block(block), key, template
+
+
+def write_block(output, block, key, template, cache=None):
+    """ Write the encoded block of a sentence to the BlockWriter, and store it in the cache if needed. """
+    output.write(block)
+    if template is not None:
+        cache.put(key, template)
+
+
+if __name__ == "__main__":
+
+    args = parser.parse_args()
+    if args.profile_rules and args.workers > 1:
+        parser.error("--profile_rules requires sequential conversion (--workers 1)")
+    if args.sent_ids and args.treebank == '-':
+        parser.error("--sent_ids requires a treebank file, not the standard input")
+    if args.format != 'umr' and (args.cache_dir or args.incremental):
+        parser.error("--cache_dir and --incremental require --format umr")
+    DISPATCHER.profile = args.profile_rules
+    # The previous output is read as a whole, so it can be overwritten by the new one.
+    previous = PreviousOutput(args.incremental) if args.incremental else None
+    input_hashes = args.input_hashes or bool(previous)
+    init_worker(args.lang, args.var_naming, args.numerals, args.resource_dir, args.cache_dir, args.cache_size,
+                input_hashes, args.format)
+    cache = _worker_config['cache']
+    keyed = bool(cache) or input_hashes
+    output_name = 'stdin' if args.treebank == '-' else args.treebank.split('.')[0]
+    output_file = f"{output_name}.{args.format}{COMPRESSED_SUFFIX if args.compress else ''}"
+
+    # To produce the test set: --sent_ids testset/sent-ids_converted_70_test.txt (or sent-ids_manual_30_test.txt)
+    if args.sent_ids:
+        # Only the selected sentences are read, in the order of the treebank, and numbered from 1.
+        index = ConlluIndex(f'{args.data_dir}/{args.treebank}')
+        sent_ids = read_sent_ids(args.sent_ids)
+        missing = [sent_id for sent_id in sent_ids if sent_id not in index]
+        if missing:
+            print(f"{len(missing)} sent_ids not found in {args.treebank}: {', '.join(missing)}", file=sys.stderr)
+        sentences = index.sentences(sent_ids)
+    else:
+        # Sentences are read and converted one at a time, so the treebank is never loaded in memory as a whole.
+        sentences = treebank_sentences(args.treebank, args.data_dir)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    # Blocks are buffered and written in large chunks.
+    with BlockWriter(os.path.join(args.output_dir, output_file), compress=args.compress) as output:
 
-                umr, root = sent_tree.to_penman()
+        if args.workers > 1:
+            # Sentences are sent to the workers as CoNLL-U lines; blocks are written back in the original order.
+            with Pool(args.workers, initializer=init_worker,
+                      initargs=(args.lang, args.var_naming, args.numerals, args.resource_dir, args.cache_dir,
+                                args.cache_size, input_hashes, args.format)) as pool:
+                tasks = sentence_tasks(enumerate(sentences, start=1), keyed, previous)
+                for block, key, template in pool.imap(convert_lines, tasks, chunksize=16):
+                    write_block(output, block, key, template, cache)
 
-                # Print out the UMR structure
-                print_structure(tree, sent_tree, umr, root, sent_num, output, print_in_file=True)
+        else:
+            for task in sentence_tasks(enumerate(sentences, start=1), keyed, previous):
+                write_block(output, *convert_lines(task), cache)
 
-                # break
+    if previous:
+        print(f'{previous.reused} sentences copied from {args.incremental}.')
+    if args.profile_rules:
+        print(DISPATCHER.report(), file=sys.stderr)
 
     print()
-    print('UD2UMR conversion completed!')
\ No newline at end of file
+    print('UD2UMR conversion completed!')
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Measures the memory taken by the UMRNodes of converted graphs, as when graphs are kept in memory for batch evaluation.
+
+    python3 scripts/memory_benchmark.py --treebank en_pud-ud-test.conllu --lang en
+
+Reports the size of a node object (including its instance dictionary, if any), next to the size of the same nodes in
+the previous layout, where their attributes were stored in an instance dictionary (see DictNode); and the heap
+allocated per node while building the graphs, as measured by tracemalloc (UD trees, UMR nodes, triples and indexes
+included).
+"""
+import sys
+import argparse
+import tracemalloc
+from main import build_graph, load_resources, open_treebank
+from conllu_reader import read_sentences, tree_from_lines
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--treebank", help="Path of the treebank in input, or '-' to read it from the standard input.",
+                    required=True)
+parser.add_argument("--lang", help="Language code of the treebank (e.g., 'en' for English).", required=True)
+parser.add_argument("--data_dir",
+                    help="Path of the directory where the input treebanks are stored, if not 'data'.", default='./data')
+parser.add_argument("--sentences", help="Maximum number of sentences to convert (default: all).", type=int)
+
+
+# The attributes of a UMRNode before it declared __slots__, in the order in which __init__ set them.
+DICT_LAYOUT = ('umr_graph', 'position', '_ud_node', 'role', '_var_name', '_parent', 'ord', 'already_added',
+               'check_needed', 'extra_level', 'entity', 'replace', 'replaced', 'lang')
+
+
+class DictNode:
+    """ A UMRNode in the previous layout: its attributes, the flags and lang included, stored in __dict__. """
+
+    def __init__(self, node):
+        for attribute in DICT_LAYOUT:
+            setattr(self, attribute, node.umr_graph.lang if attribute == 'lang' else getattr(node, attribute))
+
+
+def node_size(node) -> int:
+    """ Returns the size in bytes of a UMRNode object, including its __dict__ if it has one. """
+    size = sys.getsizeof(node)
+    if hasattr(node, '__dict__'):
+        size += sys.getsizeof(node.__dict__)
+    return size
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    resources = load_resources(args.lang)
+
+    with open_treebank(args.treebank, args.data_dir) as conllu:
+        trees = [tree_from_lines(lines, position) for position, lines in enumerate(read_sentences(conllu), start=1)]
+    trees = trees[:args.sentences]
+
+    tracemalloc.start()
+    graphs = [build_graph(tree, sent_num, args.lang, 'first', resources) for sent_num, tree in enumerate(trees, start=1)]
+    heap, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    nodes = [node for graph in graphs for node in graph.nodes]
+    print(f"graphs: {len(graphs)}, nodes: {len(nodes)}")
+    print(f"node object: {sum(map(node_size, nodes)) / len(nodes):.1f} bytes/node "
+          f"(previous layout: {sum(node_size(DictNode(node)) for node in nodes) / len(nodes):.1f} bytes/node)")
+    print(f"heap while building graphs: {heap / len(nodes):.1f} bytes/node")
@@ -0,0 +1,172 @@
+from penman.exceptions import LayoutError
+from vocabulary import invert_triple
+
+CONCEPT_ROLE = 'instance'
+
+
+def layout(triples, top, strict=False):
+    """
+    Arranges the triples of a graph into a tree rooted in `top`, making the same decisions as penman's
+    layout.configure() on a graph without epigraphical data, so that the serialization is identical to
+    penman.encode(penman.Graph(triples), top=top).
+
+    Nodes are (variable, edges) tuples; edges are (role, target) tuples, where the target is a constant, a variable
+    (re-entrancy) or a nested node, and the role of concepts is '/'.
+
+    Args:
+        triples (list): The (source, role, target) triples, in the order in which they should be laid out.
+        top (str): The variable at the top of the tree; if None, the source of the first triple.
+        strict (bool): If True, a LayoutError is raised as penman does when some triples cannot be placed in the tree
+        (e.g. a subgraph not connected to the top). Otherwise, those triples are left out of the tree.
+
+    Returns:
+        tuple: The top node, and the list of triples left out of the tree.
+    """
+    if not triples:
+        return (None, []), []
+
+    nodemap = {source: None for source, _, _ in triples}
+    if top is None:
+        top = triples[0][0]
+    if top not in nodemap:
+        raise LayoutError(f'top is not a variable: {top!r}')
+    nodemap[top] = (top, [])
+
+    # data is consumed from the end, so that triples are placed in their original order.
+    data = list(reversed(triples))
+    node, _ = _configure_node(top, data, nodemap)
+
+    skipped = []
+    while data:
+        _skipped, var, data = _find_next(data, nodemap)
+        skipped.extend(_skipped)
+        data_count = len(data)
+        if var is None or data_count == 0:
+            if strict:
+                raise LayoutError('possibly disconnected graph')
+            skipped.extend(reversed(data))
+            break
+
+        _, surprising = _configure_node(var, data, nodemap)
+
+        if len(data) == data_count and surprising:
+            skipped.insert(0, data.pop())
+        elif len(data) >= data_count:
+            if strict:
+                raise LayoutError('unknown configuration error')
+            skipped.extend(reversed(data))
+            break
+        else:
+            data = skipped + data
+            skipped = []
+
+    if skipped and strict:
+        raise LayoutError('incomplete configuration')
+
+    return node, skipped
+
+
+def _configure_node(var, data, nodemap):
+    """ Places the next triples of data under the node of var, as long as they involve var. """
+    node = nodemap[var]
+    edges = node[1]
+    # something is 'surprising' when a triple doesn't predictably fit given the current state
+    surprising = False
+
+    while data:
+        triple = data.pop()
+        if triple[0] == var:
+            _, role, target = triple
+        elif triple[2] == var and triple[1] != CONCEPT_ROLE:
+            _, role, target = invert_triple(triple)
+            surprising = True
+        else:
+            data.append(triple)
+            surprising = True
+            break
+
+        if role == CONCEPT_ROLE:
+            if target:
+                edges.insert(0, ('/', target))
+        else:
+            if target in nodemap and nodemap[target] is None:
+                nodemap[target] = node  # site of potential node context
+            edges.append((role, target))
+
+    return node, surprising
+
+
+def _find_next(data, nodemap):
+    """ Finds the next variable whose node can receive the pending triples, establishing its node if needed. """
+    var = None
+    for i in range(len(data) - 1, -1, -1):
+        source, _, target = data[i]
+        if source in nodemap and _get_or_establish_site(source, nodemap):
+            var = source
+            break
+        elif target in nodemap and _get_or_establish_site(target, nodemap):
+            var = target
+            break
+    pivot = i + 1
+    return data[pivot:], var, data[:pivot]
+
+
+def _get_or_establish_site(var, nodemap):
+    """ Turns the first edge pointing to var into a node, if var has been reached but has no node yet. """
+    if nodemap[var] is None:
+        return False
+
+    _var, edges = nodemap[var]
+    if var != _var:
+        node = (var, [])
+        nodemap[var] = node
+        for i, (role, target) in enumerate(edges):
+            if target == var and role != '/':
+                edges[i] = (role, node)
+                break
+    return True
+
+
+def format_node(node, indent=4, column=0):
+    """
+    Formats a node returned by layout() into a PENMAN string, as penman.format() does with an integer indent.
+
+    Args:
+        node (tuple): The (variable, edges) node.
+        indent (int): The number of spaces by which each level of nesting is indented.
+        column (int): The column at which the node starts.
+    """
+    var, edges = node
+    if not var:
+        return '()'
+    if not edges:
+        return f'({var!s})'
+
+    column += indent
+    joiner = '\n' + ' ' * column
+    return f'({var!s} {joiner.join(_format_edge(edge, indent, column) for edge in edges)})'
+
+
+def _format_edge(edge, indent, column):
+    role, target = edge
+    if role != '/' and not role.startswith(':'):
+        role = ':' + role
+
+    if not target:
+        return role
+    if isinstance(target, tuple):
+        return f'{role} {format_node(target, indent, column)}'
+    return f'{role} {target!s}'
+
+
+def encode(triples, top, indent=4, strict=False):
+    """
+    Serializes the triples of a graph into a PENMAN string rooted in `top`.
+    The output is identical to penman.encode(penman.Graph(triples), top=top, indent=indent); see layout() for the
+    handling of triples that cannot be placed in the tree.
+
+    Returns:
+        tuple: The PENMAN string, and the list of triples left out of it.
+    """
+    node, skipped = layout(triples, top, strict=strict)
+    return format_node(node, indent), skipped
@@ -1,15 +1,17 @@
-import udapi
+import sys, os
+sys.path.append(os.path.abspath('..'))
+from conllu_index import ConlluIndex
 
 
 if __name__ == "__main__":
 
     treebank = 'it_pud-ud-test.conllu'
 
-    doc = udapi.Document(f'../data/{treebank}')
+    # Only the index of the treebank is loaded (see conllu_index), not the treebank itself.
+    index = ConlluIndex(f'../data/{treebank}')
 
     with open("../../testset/sent-ids_converted_70_test.txt", "r") as selection:
         sents = [s.rstrip() for s in selection.readlines()]
 
-    for tree in doc.trees:
-        if tree.address() in sents:
-            print(tree.address())
+    for i in index.select(sents):
+        print(index.ids[i])
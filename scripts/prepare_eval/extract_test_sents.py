@@ -1,4 +1,7 @@
+import sys, os
 import random
+sys.path.append(os.path.abspath('..'))
+from conllu_index import ConlluIndex
 
 def select_sentences(dataset):
     news = {"01": [], "02": [], "03": [], "04": [], "05": []}
@@ -22,12 +25,8 @@ def select_sentences(dataset):
     return selected
 
 
-with open("../../data/en_pud-ud-test.conllu") as file:
-    sent_ids = []
-    for line in file:
-        if line.startswith("# sent_id"):
-            code = line.split(" = ")[1].strip()
-            sent_ids.append(code)
+# The sent_ids are read from the index of the treebank (see conllu_index), built on first use, in the order of the file.
+sent_ids = ConlluIndex("../../data/en_pud-ud-test.conllu").in_file_order()
 
 selected_sentences = sorted(select_sentences(sent_ids))
 
@@ -1,96 +1,510 @@
 import csv, json
+import os
 import re
+import pickle
+import hashlib
+import unicodedata
+from functools import lru_cache
 from typing import Union
-from googletrans import Translator
 from word2number import w2n
 
-def get_deprels(ud_tree) -> dict:
-    """ Map UD deprels to UMR roles, mostly based on UD deprels. """
-
-    mapping_conditions = {
-        'root': lambda d: d.deprel == 'root',
-        'actor': lambda d: d.deprel in ['nsubj', 'csubj', 'obl:agent'],
-        'undergoer': lambda d: d.deprel in ['obj', 'nsubj:pass', 'csubj:pass'],
-        'theme': lambda d: d.udeprel in ['xcomp', 'ccomp'],
-        'mod': lambda d: d.deprel == 'amod' or (d.udeprel == 'nmod' and d.sdeprel != 'poss' and d.feats.get('Case') != 'Gen'),
-        'OBLIQUE': lambda d: d.udeprel == 'obl' and (d.sdeprel != 'arg' or d.feats.get('Case') != 'Dat'),
-        'det': lambda d: d.udeprel == 'det',
-        'manner': lambda d: d.udeprel == 'advmod' and d.sdeprel not in ['neg', 'tmod', 'lmod'] and d.feats['Polarity'] != 'Neg',
-        'temporal': lambda d: d.deprel in ['advmod:tmod', 'obl:tmod'],
-        'location': lambda d: d.deprel == 'advmod:lmod',
-        'quant': lambda d: d.deprel == 'nummod' or d.sdeprel in ['nummod', 'numgov'],
-        'vocative': lambda d: d.deprel == 'vocative',
-        'recipient': lambda d: d.udeprel in ['iobj', 'obl'] and d.feats.get('Case') == 'Dat',
-        'MOD-POSS': lambda d: d.udeprel == 'nmod' and d.feats.get('Case') == 'Gen',
-        'possessor': lambda d: d.sdeprel == 'poss',
-        'identity-91': lambda d: d.deprel == 'appos',
-        'COPULA': lambda d: d.deprel == 'cop',
-        'conj': lambda d: d.deprel == 'conj',
-        'UNATTACHED': lambda d: d.deprel == 'parataxis',
-        'other': lambda d: d.udeprel in ['advcl', 'punct', 'cc', 'fixed', 'flat', 'mark', 'xcomp', 'dislocated', 'aux',
-                                         'discourse', 'acl', 'case', 'compound', 'dep', 'orphan', 'expl:pv']
-    }
+# Rules mapping UD deprels to UMR roles, mostly based on UD deprels, in order of priority: a node gets the role of the
+# first rule it matches. Each rule is (role, deprel test, node guard): the test only looks at the deprel and its
+# universal and subtype parts, so that it can be evaluated once per distinct deprel; the guard, if any, checks the
+# features of the node itself.
+ROLE_RULES = (
+    ('root', lambda deprel, udeprel, sdeprel: deprel == 'root', None),
+    ('actor', lambda deprel, udeprel, sdeprel: deprel in ['nsubj', 'csubj', 'obl:agent'], None),
+    ('undergoer', lambda deprel, udeprel, sdeprel: deprel in ['obj', 'nsubj:pass', 'csubj:pass'], None),
+    ('theme', lambda deprel, udeprel, sdeprel: udeprel in ['xcomp', 'ccomp'], None),
+    ('mod', lambda deprel, udeprel, sdeprel: deprel == 'amod', None),
+    ('mod', lambda deprel, udeprel, sdeprel: udeprel == 'nmod' and sdeprel != 'poss',
+     lambda d: d.feats.get('Case') != 'Gen'),
+    ('OBLIQUE', lambda deprel, udeprel, sdeprel: udeprel == 'obl' and sdeprel != 'arg', None),
+    ('OBLIQUE', lambda deprel, udeprel, sdeprel: udeprel == 'obl', lambda d: d.feats.get('Case') != 'Dat'),
+    ('det', lambda deprel, udeprel, sdeprel: udeprel == 'det', None),
+    ('manner', lambda deprel, udeprel, sdeprel: udeprel == 'advmod' and sdeprel not in ['neg', 'tmod', 'lmod'],
+     lambda d: d.feats['Polarity'] != 'Neg'),
+    ('temporal', lambda deprel, udeprel, sdeprel: deprel in ['advmod:tmod', 'obl:tmod'], None),
+    ('location', lambda deprel, udeprel, sdeprel: deprel == 'advmod:lmod', None),
+    ('quant', lambda deprel, udeprel, sdeprel: deprel == 'nummod' or sdeprel in ['nummod', 'numgov'], None),
+    ('vocative', lambda deprel, udeprel, sdeprel: deprel == 'vocative', None),
+    ('recipient', lambda deprel, udeprel, sdeprel: udeprel in ['iobj', 'obl'], lambda d: d.feats.get('Case') == 'Dat'),
+    ('MOD-POSS', lambda deprel, udeprel, sdeprel: udeprel == 'nmod', lambda d: d.feats.get('Case') == 'Gen'),
+    ('possessor', lambda deprel, udeprel, sdeprel: sdeprel == 'poss', None),
+    ('identity-91', lambda deprel, udeprel, sdeprel: deprel == 'appos', None),
+    ('COPULA', lambda deprel, udeprel, sdeprel: deprel == 'cop', None),
+    ('conj', lambda deprel, udeprel, sdeprel: deprel == 'conj', None),
+    ('UNATTACHED', lambda deprel, udeprel, sdeprel: deprel == 'parataxis', None),
+    ('other', lambda deprel, udeprel, sdeprel: udeprel in ['advcl', 'punct', 'cc', 'fixed', 'flat', 'mark', 'xcomp',
+                                                           'dislocated', 'aux', 'discourse', 'acl', 'case', 'compound',
+                                                           'dep', 'orphan', 'expl:pv'], None),
+)
+
+_candidate_rules = {}
 
-    deprels = {rel: [d for d in ud_tree.descendants if condition(d)] for rel, condition in mapping_conditions.items()}
 
-    return {k: v for k, v in deprels.items() if v}
+def compile_deprel(deprel) -> tuple:
+    """
+    Returns the (role, guard) pairs of the rules whose deprel test is passed by the given deprel, in order of priority.
+    The list stops at the first rule without a guard, since later rules can never be reached.
+    Results are cached, so each distinct deprel is compiled only once.
+    """
+    if deprel not in _candidate_rules:
+        candidates = []
+        if deprel is not None:
+            udeprel, _, sdeprel = deprel.partition(':')
+            for role, test, guard in ROLE_RULES:
+                if test(deprel, udeprel, sdeprel):
+                    candidates.append((role, guard))
+                    if guard is None:
+                        break
+        _candidate_rules[deprel] = tuple(candidates)
+    return _candidate_rules[deprel]
 
 
-def get_role_from_deprel(ud_node, deprels):
+def classify_roles(nodes) -> dict:
     """
-    Check if a node is in any of the value lists in the deprels dictionary.
-    If it is, return the corresponding key. If not, return None.
+    Assigns each UD node the UMR role of the first rule in ROLE_RULES it matches, in a single traversal.
+    Nodes that match no rule are not included in the result.
 
-    Parameters:
-    - ud_node:  node to search for in the deprels dictionary.
-    - deprels: dictionary where keys are roles and values are lists of nodes.
+    Args:
+        nodes: An iterable of UD nodes, e.g. ud_tree.descendants, or the nodes of a whole treebank.
+
+    Returns:
+        dict: node -> role.
     """
-    for mapped_role, nodes in deprels.items():
-        if ud_node in nodes:
-            return mapped_role
-    return None
+    roles = {}
+    for node in nodes:
+        for role, guard in compile_deprel(node.deprel):
+            if guard is None or guard(node):
+                roles[node] = role
+                break
+    return roles
 
 
-def load_external_files(filename: str, language: str) -> Union[set, dict]:
+def classify_treebank(trees) -> dict:
+    """ Bulk version of classify_roles(), assigning roles to the nodes of all the given trees at once. """
+    return classify_roles(node for tree in trees for node in tree.descendants)
+
+
+# Directory of the language-specific lexical resources, one subdirectory per language (see use_resource_dir()).
+DEFAULT_RESOURCE_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir,
+                                                     'external_resources'))
+_resource_dir = DEFAULT_RESOURCE_DIR
+
+
+def use_resource_dir(path):
+    """ Set the directory from which the lexical resources are loaded. Fails if the directory does not exist. """
+    global _resource_dir
+    if not os.path.isdir(path):
+        raise FileNotFoundError(f"Directory of lexical resources not found: {path}")
+    _resource_dir = path
+    _convert_numeral.cache_clear()
+
+
+def load_external_files(filename: str, language: str, resource_dir=None) -> Union[set, dict]:
     """
     Store language-specific information. Used for:
     1. interpersonal relations (filename: have_rel_role.txt);
     2. SCONJs determining the type of adverbial clauses (advcl.csv).
     3. VERBs entailing different values for modality (filename: modality.json);
-    4. disambiguated conjunctions (filename: conj.json).
+    4. disambiguated conjunctions (filename: conj.json);
+    5. number words (filename: numerals.json).
+    Resources listed in RESOURCE_INDEXERS are indexed for lookup once loaded.
+    Files are read from resource_dir/language, by default from the directory set with use_resource_dir().
     """
 
     extension = filename.split('.')[-1]
     terms = set() if extension == 'txt' else dict()
 
     try:
-        with open(f"./external_resources/{language}/{filename}", 'r') as f:
+        with open(os.path.join(resource_dir or _resource_dir, language, filename), 'r', encoding='utf-8') as f:
             if extension == 'txt':
                 terms = {line.strip() for line in f if line.strip()}
             elif extension == 'csv':
                 reader = csv.reader(f)
                 next(reader)
                 for line in reader:
-                    terms[line[0]] = {'type': line[1],
-                                      'constraint': line[2].split('|') if line[2] else None,
-                                      'polarity': line[3] if line[3] else None}
+                    terms.setdefault(line[0], []).append({'type': line[1],
+                                                          'constraint': line[2].split('|') if line[2] else None,
+                                                          'polarity': line[3] if line[3] else None})
             elif extension == 'json':
                 terms = json.load(f)
+        if filename in RESOURCE_INDEXERS:
+            terms = RESOURCE_INDEXERS[filename](terms)
         return terms
 
     except FileNotFoundError:
         print(f"File {filename.split('/')[-1]} not found. Lexical information not available.")
 
 
+class Constraint:
+    def __init__(self, expression):
+        """
+        A constraint of the lexical resources, i.e. a Python expression on `self` (the UMRNode being processed),
+        compiled once into a predicate taking the node as argument. Constraints are pickled as their expression.
+        """
+        self.expression = expression
+        self.predicate = eval(compile(f'lambda self: ({expression})', '<constraint>', 'eval'))
+
+    def __call__(self, node):
+        return self.predicate(node)
+
+    def __reduce__(self):
+        return Constraint, (self.expression,)
+
+    def __repr__(self):
+        return f"Constraint({self.expression!r})"
+
+
+def compile_constraint(expression):
+    """ Compile a constraint of the lexical resources into a Constraint. Returns None if there is no constraint. """
+    return Constraint(expression) if expression else None
+
+
+def index_modality(modality):
+    """
+    Index the modality lexicon (modality.json) for lookup:
+    - 'lexical' becomes a dictionary lemma -> entries (in file order), with each 'constraint' compiled to a predicate;
+    - in 'grammatical' entries, 'constraint_on_children' is compiled to a predicate and 'node.feats' is split into a
+      list of features.
+    """
+    lexical = {}
+    for entry in modality.get('lexical', []):
+        lexical.setdefault(entry['lemma'], []).append(dict(entry, constraint=compile_constraint(entry['constraint'])))
+
+    grammatical = [
+        dict(entry, constraint_on_children=compile_constraint(entry['constraint_on_children']),
+             **{'node.feats': entry['node.feats'].split('|')})
+        for entry in modality.get('grammatical', [])
+    ]
+
+    return {'lexical': lexical, 'grammatical': grammatical}
+
+
+def index_conjunctions(conjunctions):
+    """
+    Invert the conjunction lexicon (conj.json), from concept -> lemmas to lemma -> concept.
+    If a lemma is listed under several concepts, the first one in the file is kept.
+    """
+    index = {}
+    for concept, lemmas in conjunctions.items():
+        for lemma in lemmas:
+            index.setdefault(lemma, concept)
+    return index
+
+
+def index_advcl(advcls):
+    """
+    Index the adverbial clause lexicon (advcl.csv) as lemma -> senses, in file order. Each sense has a 'type', a
+    'polarity' and a 'constraint' on the features of the parent, parsed into a list of (feature, value) pairs.
+    """
+    return {
+        lemma: [dict(sense, constraint=[tuple(c.split('=')) for c in sense['constraint'] if c]
+                     if sense['constraint'] else None)
+                for sense in senses]
+        for lemma, senses in advcls.items()
+    }
+
+
+def index_numerals(numerals):
+    """
+    Index the number words of a language (numerals.json). The file has four sections:
+    - numbers: words whose value is added to the current group (e.g. 'three', 'twenty');
+    - multipliers: words multiplying the current group (e.g. 'hundred');
+    - scales: words closing the current group, multiplied by their value (e.g. 'thousand', 'million');
+    - ignore: words that may appear between number words (e.g. 'and').
+
+    Returns:
+        tuple: normalized word -> (section, value), and the length of the longest word.
+    """
+    lexicon = {}
+    for section in ['numbers', 'multipliers', 'scales']:
+        for word, value in numerals.get(section, {}).items():
+            lexicon[normalize_numeral(word)] = (section, value)
+    for word in numerals.get('ignore', []):
+        lexicon[normalize_numeral(word)] = ('ignore', None)
+
+    return lexicon, max(map(len, lexicon), default=0)
+
+
+# Functions building lookup indexes for the lexical resources, applied by load_external_files().
+RESOURCE_INDEXERS = {
+    'modality.json': index_modality,
+    'conj.json': index_conjunctions,
+    'advcl.csv': index_advcl,
+    'numerals.json': index_numerals,
+}
+
+
+class ResourceBundle:
+    # Files loaded for each language; the first four are passed to UMRGraph, in this order.
+    FILES = ('have_rel_role.txt', 'advcl.csv', 'modality.json', 'conj.json', 'numerals.json')
+    # Bump when the indexes change, to invalidate existing snapshots.
+    SNAPSHOT_VERSION = 1
+
+    def __init__(self, language, resource_dir=None, snapshot=True):
+        """
+        All the lexical resources of a language, loaded and indexed once.
+
+        The indexed resources are saved in a snapshot (__pycache__/resources.pickle in the language directory), which
+        is reused as long as the source files do not change: files are compared by modification time and size, and
+        by their SHA-256 hash when those differ. If the snapshot cannot be written, resources are just not cached.
+
+        Attributes:
+            self.language (str): The language code.
+            self.resource_dir (str): The directory with one subdirectory per language.
+            self.directory (str): The directory of the language resources.
+            self.stamps (dict): filename -> (mtime_ns, size, sha256) of the source files, or None if missing.
+            self.resources (dict): filename -> indexed resource, or None if the file is missing.
+
+        Args:
+            language (str): The language code.
+            resource_dir (str): The directory with one subdirectory per language; by default, the one set with
+            use_resource_dir(). A FileNotFoundError is raised if it does not exist.
+            snapshot (bool): Whether to reuse and save the snapshot.
+        """
+        resource_dir = resource_dir or _resource_dir
+        if not os.path.isdir(resource_dir):
+            raise FileNotFoundError(f"Directory of lexical resources not found: {resource_dir}")
+
+        self.language = language
+        self.resource_dir = resource_dir
+        self.directory = os.path.join(resource_dir, language)
+        self.stamps = {}
+        self.resources = {}
+
+        if not (snapshot and self.load_snapshot()):
+            self.build()
+            if snapshot:
+                self.save_snapshot()
+
+    @property
+    def snapshot_path(self):
+        return os.path.join(self.directory, '__pycache__', 'resources.pickle')
+
+    @staticmethod
+    def file_stamp(path, previous=None):
+        """ Returns (mtime_ns, size, sha256) of the file, reusing the previous hash if mtime and size did not change. """
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        if previous and previous[:2] == (stat.st_mtime_ns, stat.st_size):
+            return previous
+        with open(path, 'rb') as f:
+            return stat.st_mtime_ns, stat.st_size, hashlib.sha256(f.read()).hexdigest()
+
+    def build(self):
+        """ Loads and indexes all the resources from the source files. """
+        for filename in self.FILES:
+            path = os.path.join(self.directory, filename)
+            self.stamps[filename] = self.file_stamp(path)
+            self.resources[filename] = (load_external_files(filename, self.language, self.resource_dir)
+                                        if self.stamps[filename] else None)
+
+        missing = [filename for filename in self.FILES[:4] if not self.stamps[filename]]
+        if missing:
+            print(f"Files {', '.join(missing)} not found for '{self.language}'. Lexical information not available.")
+
+    def load_snapshot(self):
+        """ Loads the resources from the snapshot, if it is up to date. Returns True on success. """
+        try:
+            with open(self.snapshot_path, 'rb') as f:
+                snapshot = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return False
+        if snapshot.get('version') != self.SNAPSHOT_VERSION or set(snapshot['stamps']) != set(self.FILES):
+            return False
+
+        stamps = {}
+        for filename, previous in snapshot['stamps'].items():
+            stamps[filename] = self.file_stamp(os.path.join(self.directory, filename), previous)
+            if (stamps[filename] and stamps[filename][2]) != (previous and previous[2]):
+                return False
+
+        self.stamps, self.resources = stamps, snapshot['resources']
+        if stamps != snapshot['stamps']:
+            self.save_snapshot()  # only the modification times changed; store them to avoid hashing next time.
+        return True
+
+    def save_snapshot(self):
+        """ Saves the resources in the snapshot, atomically; does nothing if the directory is not writable. """
+        if not os.path.isdir(self.directory):
+            return
+
+        snapshot = {'version': self.SNAPSHOT_VERSION, 'stamps': self.stamps, 'resources': self.resources}
+        temporary = f'{self.snapshot_path}.{os.getpid()}'
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_path), exist_ok=True)
+            with open(temporary, 'wb') as f:
+                pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, self.snapshot_path)
+        except OSError:
+            pass
+
+    @property
+    def digest(self) -> str:
+        """ A hash of the language and of the content of its source files, identifying the resources in use. """
+        sha = hashlib.sha256(self.language.encode())
+        for filename in self.FILES:
+            stamp = self.stamps.get(filename)
+            sha.update(f"\0{filename}\0{stamp[2] if stamp else ''}".encode())
+        return sha.hexdigest()
+
+    @property
+    def rel_roles(self):
+        return self.resources['have_rel_role.txt']
+
+    @property
+    def advcls(self):
+        return self.resources['advcl.csv']
+
+    @property
+    def modality(self):
+        return self.resources['modality.json']
+
+    @property
+    def conjunctions(self):
+        return self.resources['conj.json']
+
+    @property
+    def numerals(self):
+        return self.resources['numerals.json']
+
+    def graph_resources(self):
+        """ Returns the resources in the order expected by UMRGraph. """
+        return self.rel_roles, self.advcls, self.modality, self.conjunctions
+
+
+_bundles = {}
+
+
+def load_bundle(language):
+    """ Returns the ResourceBundle of a language, loaded once per process (and resource directory). """
+    key = (language, _resource_dir)
+    if key not in _bundles:
+        _bundles[key] = ResourceBundle(language)
+    return _bundles[key]
+
+
 def is_number(text):
     """ Regular expression for a valid number with optional commas, decimals, or scientific notation. """
     pattern = r'^[+-]?(\d{1,3}(,\d{3})*|\d+)([\.,]\d+)?([eE][+-]?\d+)?$'
     return bool(re.match(pattern, text))
 
 
+def normalize_numeral(text):
+    """ Lowercase the numeral and drop hyphens, so that e.g. 'quatre-vingt-dix' is segmented as a single word. """
+    return unicodedata.normalize('NFC', text.lower()).replace('-', '')
+
+
+def load_numeral_lexicon(language):
+    """ Returns the indexed number words of a language (see index_numerals()), or None if there are none. """
+    return load_bundle(language).numerals
+
+
+def segment_numeral(word, lexicon, longest):
+    """
+    Split a (compound) number word into the fewest words of the lexicon, e.g. 'duecentotré' -> ('due', 'cento', 'tré').
+    Returns None if the word cannot be segmented.
+    """
+    best = [()] + [None] * len(word)
+    for end in range(1, len(word) + 1):
+        for start in range(max(0, end - longest), end):
+            if best[start] is not None and word[start:end] in lexicon:
+                candidate = best[start] + (word[start:end],)
+                if best[end] is None or len(candidate) < len(best[end]):
+                    best[end] = candidate
+    return best[-1]
+
+
+def words_to_number(numeral, language):
+    """
+    Convert a number written in words into an integer, using the lexicon of the given language.
+    As in word2number, values are added up within groups, which are closed by scale words (thousand, million, ...).
+
+    Raises:
+        ValueError: if there is no lexicon for the language, or the numeral contains unknown words.
+    """
+    compiled = load_numeral_lexicon(language)
+    if not compiled:
+        raise ValueError(f"No number words available for language '{language}'.")
+    lexicon, longest = compiled
+
+    total, current, found = 0, 0, False
+    for word in normalize_numeral(numeral).split():
+        pieces = segment_numeral(word, lexicon, longest)
+        if pieces is None:
+            raise ValueError(f"Unknown number word: {word}")
+
+        for piece in pieces:
+            section, value = lexicon[piece]
+            if section == 'numbers':
+                current += value
+            elif section == 'multipliers':
+                current = (current or 1) * value
+            elif section == 'scales':
+                total += (current or 1) * value
+                current = 0
+            else:
+                continue
+            found = True
+
+    if not found:
+        raise ValueError(f"No valid number words found in: {numeral}")
+    return total + current
+
+
+_translator = None
+
+
+def translate_with_googletrans(numeral, input_lang):
+    """
+    Translate the numeral into English with Google Translate, then convert it with word2number.
+    Requires the googletrans package and network access.
+    """
+    global _translator
+    if _translator is None:
+        from googletrans import Translator
+        _translator = Translator()
+        _translator.raise_Exception = True
+
+    try:
+        translation = _translator.translate(numeral, src=input_lang, dest='en')
+        return w2n.word_to_num(translation.text)
+
+    except ValueError:
+        raise
+
+    except Exception as e:
+        print(f"Unexpected error occurred: {e}")
+        return numeral
+
+
+# Backends converting non-English number words into digits, selected with use_numeral_backend().
+NUMERAL_BACKENDS = {
+    'lexicon': words_to_number,
+    'googletrans': translate_with_googletrans,
+}
+
+_numeral_backend = 'lexicon'
+
+
+def use_numeral_backend(name):
+    """ Select the backend used by translate_number() for non-English numerals (see NUMERAL_BACKENDS). """
+    global _numeral_backend
+    if name not in NUMERAL_BACKENDS:
+        raise ValueError(f"Unknown numeral backend '{name}'; expected one of {list(NUMERAL_BACKENDS)}.")
+    _numeral_backend = name
+
+
 def translate_number(numeral, input_lang):
     """
     Translates a given numeral from the specified input language to English and converts it to a digit.
+    English numerals are converted with word2number, other languages with the selected backend (by default, the
+    offline lexicons in external_resources). Numerals that cannot be converted are returned unchanged.
 
     Args:
         numeral (str): The numeral to be translated.
@@ -99,30 +513,19 @@ def translate_number(numeral, input_lang):
     Returns:
         int: The numeric value of the translated numeral.
     """
-    translator = Translator()
-
-    if input_lang != 'en':
-        if not is_number(numeral):
-            try:
-                translator.raise_Exception = True
-                translation = translator.translate(numeral, src=input_lang, dest='en')
-                en_text = translation.text
-                return w2n.word_to_num(en_text)
-
-            except ValueError: # as e:
-                # print(f"Conversion error occurred: {e}")
-                return numeral
-
-            except Exception as e:
-                print(f"Unexpected error occurred: {e}")
-                return numeral
-        else:
-            return numeral
-    else:
-        if not is_number(numeral):
-            try:
-                return w2n.word_to_num(numeral)
-            except ValueError:
-                return numeral
-        else:
-            return numeral
+    if is_number(numeral):
+        return numeral
+    return _convert_numeral(numeral, input_lang, _numeral_backend)
+
+
+@lru_cache(maxsize=4096)
+def _convert_numeral(numeral, input_lang, backend):
+    """ Memoized conversion of a numeral written in words; the backend is part of the key. """
+    try:
+        if input_lang == 'en':
+            return w2n.word_to_num(numeral)
+        return NUMERAL_BACKENDS[backend](numeral, input_lang)
+
+    except ValueError:  # as e:
+        # print(f"Conversion error occurred: {e}")
+        return numeral
@@ -1,91 +1,104 @@
 import sys
-import penman
+import warnings
 from penman.exceptions import LayoutError
 
-from umr_graph import reorder_triples
+from penman_serializer import encode
 
-def numbered_line_with_alignment(tree, output_file=None):
-    """
-    Prints a line of words with progressive numbering aligned to the left of each word.
-    It takes in input a Udapi tree (tree) and prints out two lines:
-      - `Index`: A single line with indexes aligned to appear above each token, aligned to the left.
-      - `Words`: A single line with the tokens separated by spaces.
+def index_and_word_lines(words):
     """
-    destination = output_file if output_file else sys.stdout
-    words = [t.form for t in tree.descendants]
+    Builds the `Index` and `Words` lines of a sentence in a single pass. Words are followed by one space, or two after
+    one-character words from the 10th on, to leave room for two-digit indexes; each index is printed at the column
+    where its word starts, padding the index line with a single run of spaces.
 
-    word_line = ''.join(
-        word + (' ' * 2 if len(word) == 1 and i > 9 else ' ')
-        for i, word in enumerate(words, start=1)
-    ).strip()
+    Args:
+        words (list[str]): The tokens of the sentence.
 
-    index_line_parts = []
-    current_pos = 0
+    Returns:
+        tuple: The index line and the word line (without their labels).
+    """
+    index_parts, word_parts = [], []
+    index_length = column = 0
 
     for i, word in enumerate(words, start=1):
         index_str = str(i)
+        if index_length < column:
+            index_parts.append(' ' * (column - index_length))  # fill spaces until alignment is correct
+            index_length = column
+        index_parts.append(index_str)
+        index_length += len(index_str)
 
-        # Ensure the index starts at the correct position
-        while len(''.join(index_line_parts)) < current_pos:
-            index_line_parts.append(' ')  # Fill spaces until alignment is correct
-
-        index_line_parts.append(index_str)
+        word_parts.append(word + (' ' * 2 if len(word) == 1 and i > 9 else ' '))
         min_spacing = 1 if (len(word) > 1 or (len(word) == 1 and len(index_str) == 1)) else 2
-        current_pos += len(word) + min_spacing  # Adjust position for the next word
+        column += len(word) + min_spacing  # column of the next index
+
+    return ''.join(index_parts), ''.join(word_parts).strip()
 
-    index_line = ''.join(index_line_parts)
+
+def numbered_line_with_alignment(tree, output_file=None):
+    """
+    Prints a line of words with progressive numbering aligned to the left of each word.
+    It takes in input a Udapi tree (tree) and prints out two lines:
+      - `Index`: A single line with indexes aligned to appear above each token, aligned to the left.
+      - `Words`: A single line with the tokens separated by spaces.
+    """
+    destination = output_file if output_file else sys.stdout
+    index_line, word_line = index_and_word_lines([t.form for t in tree.descendants])
 
     print(f'Index: {index_line}', file=destination)
     print(f'Words: {word_line}', file=destination)
 
 
-def print_structure(tree, sent_tree, umr, root, sent_num, output_file=None, print_in_file=False):
+def render_structure(tree, sent_tree, umr, root, sent_num) -> str:
     """
-    Prints a structured UMR representation, including the sentence id, text, sentence-level graph, and alignments.
+    Renders a structured UMR representation, including the sentence id, text, sentence-level graph, and alignments,
+    as a single string (the block of the sentence).
     Takes in input:
     - tree: Udapi tree.
     - sent_tree: UMRGraph
-    - umr: the UMR graph itself.
+    - umr: the triples of the UMR graph, as returned by UMRGraph.to_penman().
     - sent_num: the progressive number of the sentence.
     """
-
-    destination = output_file if print_in_file else sys.stdout
-
     umr_string = None
     if umr:
         try:
-            umr_string = penman.encode(umr, top=root, indent=4)
+            umr_string, skipped = encode(umr, root, indent=4)
         except LayoutError as e:
-            for n in reorder_triples(sent_tree.triples):
-                print(n)
-            print(f"Skipping sentence due to LayoutError: {e}")
-
-    print('#' * 80, file=destination)
-    print(f'# meta-info :: sent_id = {tree.address()}', file=destination)
-    print(f'# :: snt{sent_num}', file=destination)
-    numbered_line_with_alignment(tree, destination)
-    print(f'Sentence: {tree.text}', file=destination)
+            warnings.warn(f"[Warning] Skipping the graph of sentence {tree.address()} due to LayoutError: {e}")
+        else:
+            # Triples that cannot be placed in the graph (e.g. a cycle not connected to the root) are left out,
+            # instead of skipping the whole sentence.
+            if skipped:
+                warnings.warn(f"[Warning] Triples left out of the graph of sentence {tree.address()}: {skipped}")
+                umr = [triple for triple in umr if triple not in skipped]
+
+    index_line, word_line = index_and_word_lines([t.form for t in tree.descendants])
+    lines = ['#' * 80,
+             f'# meta-info :: sent_id = {tree.address()}',
+             f'# :: snt{sent_num}',
+             f'Index: {index_line}',
+             f'Words: {word_line}',
+             f'Sentence: {tree.text}']
     if sent_tree.lang != 'en':
         en_sent = [c for c in tree.comment.split('\n') if c.startswith(" text_en = ")]
         if en_sent:
-            print('Sentence Gloss (en):', f"{en_sent[0].lstrip(' text_en = ')}", file=destination)
-        print(file=destination)
-    else:
-        print(file=destination)
-    print('# sentence level graph:', file=destination)
+            lines.append(f"Sentence Gloss (en): {en_sent[0].lstrip(' text_en = ')}")
+    lines.append('')
+    lines.append('# sentence level graph:')
 
     if umr_string and len(umr_string) > 2:
-        print(umr_string, file=destination)
-        print(file=destination)
-        print('# alignment:', file=destination)
-        sent_tree.alignments(umr, output_file)
-        print(file=destination)
-        print('# document level annotation:', file=destination)
-        print('\n', file=destination)
+        lines.extend((umr_string, '', '# alignment:'))
+        lines.extend(sent_tree.alignment(umr).lines())
     else:
-        print(f'({sent_tree.root_var} / sentence)', file=destination)
-        print(file=destination)
-        print('# alignment:', file=destination)
-        print(file=destination)
-        print('# document level annotation:', file=destination)
-        print('\n', file=destination)
+        lines.extend((f'({sent_tree.root_var} / sentence)', '', '# alignment:'))
+    lines.extend(('', '# document level annotation:', '', '', ''))
+
+    return '\n'.join(lines)
+
+
+def print_structure(tree, sent_tree, umr, root, sent_num, output_file=None, print_in_file=False):
+    """
+    Prints a structured UMR representation, including the sentence id, text, sentence-level graph, and alignments
+    (see render_structure).
+    """
+    destination = output_file if print_in_file else sys.stdout
+    destination.write(render_structure(tree, sent_tree, umr, root, sent_num))
@@ -0,0 +1,93 @@
+import time
+
+
+class Rule:
+    def __init__(self, name, test, handler, guard=None):
+        """
+        A conversion rule: a handler applied to the UMRNodes whose UD node matches the rule.
+
+        Args:
+            name (str): The name of the rule, used in profiling reports.
+            test (function): Tells from (upos, deprel, udeprel, sdeprel) if a UD node can match the rule; it is
+                evaluated once per distinct (upos, deprel) pair.
+            handler (function): Applied to the matching UMRNode.
+            guard (function, optional): An additional check on the UMRNode, evaluated for every node.
+        """
+        self.name = name
+        self.test = test
+        self.handler = handler
+        self.guard = guard
+
+    def __repr__(self):
+        return f"Rule({self.name})"
+
+
+class RuleDispatcher:
+    def __init__(self, *tables):
+        """
+        Selects the conversion rules to apply to a UMRNode. Each table is a sequence of rules in order of priority,
+        and a node is handled by (at most) the first rule of each table it matches.
+
+        The candidate rules of each (upos, deprel) pair are compiled once; a candidate list stops at the first rule
+        without a guard, since later rules can never be reached. Selecting the rules of a node is then a dictionary
+        lookup, followed by the evaluation of the few guards left.
+
+        Attributes:
+            self.tables (tuple): The rule tables.
+            self.profile (bool): Whether rule applications are counted and timed.
+            self.counts (dict): rule name -> number of applications, when profiling.
+            self.times (dict): rule name -> total time spent in the handler (seconds), when profiling.
+        """
+        self.tables = tables
+        self._candidates = {}
+        self.profile = False
+        self.counts = {}
+        self.times = {}
+
+    def compile(self, upos, deprel) -> tuple:
+        """ Returns, for each table, the rules whose test is passed by the given upos and deprel, in order of priority. """
+        key = (upos, deprel)
+        if key not in self._candidates:
+            udeprel, _, sdeprel = (deprel or '').partition(':')
+            compiled = []
+            for table in self.tables:
+                candidates = []
+                for rule in table:
+                    if rule.test(upos, deprel, udeprel, sdeprel):
+                        candidates.append(rule)
+                        if rule.guard is None:
+                            break
+                compiled.append(tuple(candidates))
+            self._candidates[key] = tuple(compiled)
+        return self._candidates[key]
+
+    def select(self, node, table=0):
+        """ Returns the first rule of the given table matched by the UMRNode, or None. """
+        for rule in self.compile(node.ud_node.upos, node.ud_node.deprel)[table]:
+            if rule.guard is None or rule.guard(node):
+                return rule
+        return None
+
+    def dispatch(self, node, table=0):
+        """ Applies to the UMRNode the first rule of the given table it matches, if any. """
+        rule = self.select(node, table)
+        if rule is None:
+            return
+        if not self.profile:
+            rule.handler(node)
+            return
+
+        start = time.perf_counter()
+        try:
+            rule.handler(node)
+        finally:
+            self.times[rule.name] = self.times.get(rule.name, 0.0) + time.perf_counter() - start
+            self.counts[rule.name] = self.counts.get(rule.name, 0) + 1
+
+    def report(self) -> str:
+        """ Returns a table of the profiled rules, sorted by total time. """
+        lines = [f"{'rule':<24}{'count':>10}{'total (s)':>12}{'mean (ms)':>12}"]
+        for name in sorted(self.times, key=self.times.get, reverse=True):
+            count, total = self.counts[name], self.times[name]
+            lines.append(f"{name:<24}{count:>10}{total:>12.3f}{1000 * total / count:>12.3f}")
+        return '\n'.join(lines)
@@ -0,0 +1,111 @@
+_ANY = object()
+
+
+class TripleStore:
+    def __init__(self, triples=()):
+        """
+        Stores the (source, role, target) triples of a UMR graph, keeping their insertion order (like a list) and
+        indexing them by source variable, role and target, so that lookups do not scan the whole graph.
+
+        Each triple is stored under an entry id, which plays the role of the list index: `store[i] = triple` replaces
+        a triple in place, `del store[i]` removes it. Duplicate triples are allowed, as in a list.
+
+        Attributes:
+            self._triples (dict): entry id -> triple, in insertion order.
+            self._indexes (tuple[dict]): for each position (0, 1, 2), value -> {entry id: None}.
+            self._counts (dict): triple -> number of occurrences, for membership tests.
+        """
+        self._triples = {}
+        self._next_id = 0
+        self._indexes = ({}, {}, {})
+        self._counts = {}
+        self.extend(triples)
+
+    def __repr__(self):
+        return f"TripleStore({list(self._triples.values())})"
+
+    def __len__(self):
+        return len(self._triples)
+
+    def __iter__(self):
+        """ Iterates over a snapshot of the triples, so the store can be modified while looping. """
+        return iter(list(self._triples.values()))
+
+    def __contains__(self, triple):
+        return triple in self._counts
+
+    def __getitem__(self, entry_id):
+        return self._triples[entry_id]
+
+    def __setitem__(self, entry_id, triple):
+        """ Replace the triple stored under entry_id, keeping its position. """
+        self._unindex(entry_id)
+        self._triples[entry_id] = triple
+        self._index(entry_id, triple)
+
+    def __delitem__(self, entry_id):
+        self._unindex(entry_id)
+        del self._triples[entry_id]
+
+    def _index(self, entry_id, triple):
+        for position, index in enumerate(self._indexes):
+            index.setdefault(triple[position], {})[entry_id] = None
+        self._counts[triple] = self._counts.get(triple, 0) + 1
+
+    def _unindex(self, entry_id):
+        triple = self._triples[entry_id]
+        for position, index in enumerate(self._indexes):
+            ids = index[triple[position]]
+            del ids[entry_id]
+            if not ids:
+                del index[triple[position]]
+        self._counts[triple] -= 1
+        if not self._counts[triple]:
+            del self._counts[triple]
+
+    def append(self, triple):
+        self._triples[self._next_id] = triple
+        self._index(self._next_id, triple)
+        self._next_id += 1
+
+    def extend(self, triples):
+        for triple in triples:
+            self.append(triple)
+
+    def remove(self, triple):
+        """ Remove the first occurrence of the triple. Raises ValueError if it is not present. """
+        for entry_id, t in self.items(source=triple[0], target=triple[2]):
+            if t == triple:
+                del self[entry_id]
+                return
+        raise ValueError(f"{triple} not in TripleStore")
+
+    def items(self, source=_ANY, role=_ANY, target=_ANY):
+        """
+        Returns the (entry id, triple) pairs matching the given source, role and/or target, in insertion order.
+        Only the smallest of the relevant indexes is scanned.
+        """
+        constraints = [(position, value) for position, value in enumerate((source, role, target)) if value is not _ANY]
+        if not constraints:
+            return list(self._triples.items())
+
+        candidates = [self._indexes[position].get(value, {}) for position, value in constraints]
+        smallest = min(candidates, key=len)
+        return [(entry_id, self._triples[entry_id]) for entry_id in sorted(smallest)
+                if all(self._triples[entry_id][position] == value for position, value in constraints)]
+
+    def select(self, source=_ANY, role=_ANY, target=_ANY):
+        """ Returns the triples matching the given source, role and/or target, in insertion order. """
+        return [triple for _, triple in self.items(source, role, target)]
+
+    def first(self, source=_ANY, role=_ANY, target=_ANY):
+        """ Returns the first triple matching the given source, role and/or target, or None. """
+        matching = self.items(source, role, target)
+        return matching[0][1] if matching else None
+
+    def remove_where(self, source=_ANY, role=_ANY, target=_ANY):
+        """ Removes all the triples matching the given source, role and/or target, and returns them. """
+        matching = self.items(source, role, target)
+        for entry_id, _ in matching:
+            del self[entry_id]
+        return [triple for _, triple in matching]
@@ -0,0 +1,92 @@
+DESCENDANT_KINDS = {
+    'rel_pron': lambda d: 'Rel' in d.feats['PronType'],
+    'pron': lambda d: d.upos == 'PRON' and d.feats['PronType'] != 'Prs',
+    'adv': lambda d: d.upos == 'ADV',
+}
+
+GROUP_KEYS = ('deprel', 'udeprel', 'upos')
+
+
+class UDIndex:
+    def __init__(self, ud_tree):
+        """
+        Precomputed views of a UD tree, built in a single pass and shared by all the UMRNode handlers of a sentence,
+        so that they do not materialize and filter udapi child, sibling and descendant lists over and over again.
+
+        Children lists keep the order of the UD tree (i.e. by ord), as udapi does.
+
+        Attributes:
+            self.groups (dict): parent UD node -> {(attribute, value): [children]}, for every attribute in GROUP_KEYS;
+                ('all', None) holds all the children.
+            self.candidates (dict): kind -> the nodes of the tree matching DESCENDANT_KINDS[kind], by ord.
+            self.feature_sets (dict): UD node -> the set of its 'Feature=Value' strings, computed on first use.
+        """
+        self.groups = {}
+        self.candidates = {kind: [] for kind in DESCENDANT_KINDS}
+        self.feature_sets = {}
+
+        for node in ud_tree.descendants:
+            groups = self.groups.setdefault(node.parent, {})
+            groups.setdefault(('all', None), []).append(node)
+            for attribute in GROUP_KEYS:
+                groups.setdefault((attribute, getattr(node, attribute)), []).append(node)
+            for kind, test in DESCENDANT_KINDS.items():
+                if test(node):
+                    self.candidates[kind].append(node)
+
+    def children(self, node, deprel=None, udeprel=None, upos=None):
+        """
+        Returns the children of a UD node, optionally restricted to the given deprel, udeprel and/or upos.
+        Only one group is looked up; further restrictions filter that group.
+        """
+        constraints = [(attribute, value) for attribute, value in zip(GROUP_KEYS, (deprel, udeprel, upos))
+                       if value is not None]
+        groups = self.groups.get(node, {})
+        if not constraints:
+            return list(groups.get(('all', None), ()))
+
+        key, rest = constraints[0], constraints[1:]
+        return [c for c in groups.get(key, ()) if all(getattr(c, attribute) == value for attribute, value in rest)]
+
+    def group(self, node, attribute, value):
+        """
+        Returns the children of a UD node whose attribute (one of GROUP_KEYS) has the given value, without copying the
+        stored list; callers must not modify it.
+        """
+        groups = self.groups.get(node)
+        return groups.get((attribute, value), ()) if groups else ()
+
+    def siblings(self, node, deprel=None, udeprel=None, upos=None):
+        """ Returns the siblings of a UD node (i.e. udapi's node.siblings), optionally restricted as in children(). """
+        return [s for s in self.children(node.parent, deprel, udeprel, upos) if s is not node]
+
+    def first_descendant(self, node, kind):
+        """ Returns the first descendant of a UD node (by ord) matching DESCENDANT_KINDS[kind], or None. """
+        for candidate in self.candidates[kind]:
+            ancestor = candidate.parent
+            while ancestor is not None:
+                if ancestor is node:
+                    return candidate
+                ancestor = ancestor.parent
+        return None
+
+    def feature_set(self, node):
+        """ Returns the features of a UD node as a set of 'Feature=Value' strings. """
+        features = self.feature_sets.get(node)
+        if features is None:
+            features = self.feature_sets[node] = set(str(node.feats).split('|'))
+        return features
+
+    def set_deprel(self, node, deprel):
+        """ Changes the deprel of a UD node, keeping the groups of its parent up to date. """
+        groups = self.groups.get(node.parent, {})
+        for attribute, value in (('deprel', node.deprel), ('udeprel', node.udeprel)):
+            group = groups.get((attribute, value), [])
+            if node in group:
+                group.remove(node)
+
+        node.deprel = deprel
+        for attribute in ('deprel', 'udeprel'):
+            group = groups.setdefault((attribute, getattr(node, attribute)), [])
+            group.append(node)
+            group.sort(key=lambda n: n.ord)
@@ -1,115 +1,112 @@
 import re, sys
 from collections import defaultdict
-import penman
-import warnings
-from penman.exceptions import LayoutError
-
-from umr_node import UMRNode, type_of_triple
-
-def has_parent_attached(parent, stored_dependencies, root, visited=None):
-    """ Checks whether a node is connected to another node, in order to identify disconnected ones.
-    Returns the parent node if it is disconnected, else None.
-
-    Args:
-        parent (str): The current node being checked.
-        stored_dependencies (dict): A dictionary representing the graph, where keys are nodes and values are sets of
-        child nodes.
-        root (str): The root node of the graph, representing the expected endpoint of a valid path.
-        visited (set, optional): A set of nodes that have been visited during the traversal, used to detect cycles.
-        Defaults to `None`.
-    """
-    if visited is None:
-        visited = set()
-
-    # if the parent is None, or the root has been reached, return None (no disconnection).
-    if parent is None or parent == root:
-        return None
 
-    # if this node has already been visited, it is a cycle.
-    if parent in visited:
-        # raise ValueError(f"Cyclic dependency detected starting at {parent}")
-        return None
+from umr_node import UMRNode, DISPATCHER
+from triple_store import TripleStore
+from ud_index import UDIndex
+from alignment import Alignment, function_word_ords, token_spans
+from vocabulary import ROLES, type_of_triple
 
-    visited.add(parent)
-    keys_with_child = [key for key, value_set in stored_dependencies.items() if parent in value_set]
-    if not keys_with_child:
-        return parent
-    grandparent = keys_with_child[0]
-    return has_parent_attached(grandparent, stored_dependencies, root, visited)
+POSITIONS = ('source', 'role', 'target')
 
 
 def reorder_triples(triples):
     """
     Reorders the list of triples stored based on a custom hierarchy for the role in each triple, to reflect a natural
-    order of manual annotation.
+    order of manual annotation (see vocabulary.ROLE_PRIORITY).
+    The sort is stable, so triples with the same priority keep the order in which they were created: since no pass
+    goes through a set, the resulting order is total and does not depend on string hashing (PYTHONHASHSEED).
     """
-    def get_priority(role):
-
-        hierarchy_order = {
-            'instance': 0,
-            'actor': 1,
-            'experiencer': 2,
-            'undergoer': 3,
-            'theme': 4,
-            'stimulus': 5,
-            'ARG1': 6,
-            'ARG2': 7,
-            'ARG3': 8,
-            'ARG4': 9,
-            'affectee': 10,
-            'OBLIQUE': 11,
-            'manner': 12,
-            'mod': 13,
-            'op1': 14,
-            'op2': 15,
-            'op3': 16,
-            'op4': 17,
-            'op5': 18,
-            'refer-person': 19,
-            'refer-number': 20,
-            'modal-predicate': 21,
-            'modal-strength': 22,
-            'aspect': 23,
-            'quot': 24
-        }
-        return hierarchy_order.get(role, float('inf'))
-
-    return sorted(triples, key=lambda t: get_priority(t[1]))
+    return sorted(triples, key=lambda t: ROLES[t[1]].priority)
+
+
+class VariableAllocator:
+    def __init__(self):
+        """
+        Allocates unique variable names within a UMR graph, without scanning the names already in use.
+
+        Attributes:
+            self.used (set): The variable names already allocated.
+            self.next_suffix (dict): base prefix (e.g. 's1h') -> the next numeric suffix to try.
+            self.names_by_base (dict): base prefix -> the names allocated with that prefix, in increasing order.
+        """
+        self.used = set()
+        self.next_suffix = {}
+        self.names_by_base = {}
+
+    def allocate(self, base_name):
+        """ Returns the first free name among base_name, base_name2, base_name3, etc. and marks it as used. """
+        count = self.next_suffix.get(base_name, 1)
+        var_name = base_name if count == 1 else f"{base_name}{count}"
+        while var_name in self.used:
+            count += 1
+            var_name = f"{base_name}{count}"
+
+        self.next_suffix[base_name] = count + 1
+        self.used.add(var_name)
+        self.names_by_base.setdefault(base_name, []).append(var_name)
+        return var_name
+
+    def rename(self, base_name, renaming):
+        """
+        Updates the names allocated with base_name according to the renaming map {old name: new name}.
+        Names taken over by a renamed variable without being renamed themselves are released.
+        """
+        released = set(renaming.values()) - set(renaming)
+        names = self.names_by_base[base_name]
+        self.used.difference_update(names)
+        names = [renaming.get(var, var) for var in names if var not in released]
+        self.used.update(names)
+        self.names_by_base[base_name] = names
 
 
 class UMRGraph:
-    def __init__(self, ud_tree, sent_num, deprels, language, vnaming, rel_roles, advcls, modality, conjunctions):
+    def __init__(self, ud_tree, sent_num, roles, language, vnaming, rel_roles, advcls, modality, conjunctions,
+                 dispatcher=DISPATCHER):
         """
         Initializes a UMRGraph instance to represent a sentence UMR graph.
 
         Attributes:
             ud_tree: The UD tree (Udapi Node).
             sent_num: The sentence number.
-            deprels (dict): A dictionary mapping UD dependency relations to UMR roles.
+            roles (dict): A dictionary mapping UD nodes to UMR roles, as returned by preprocess.classify_roles().
+            self.ud_index (UDIndex): Precomputed children, siblings, descendants and features of the UD tree.
+            self.dispatcher (RuleDispatcher): Selects the rules applied by UMRNode.ud_to_umr().
             self.root_var (str, optional): A variable representing the root of the UMR graph.
             self.nodes (list[UMRNode]): A list of UMRNode instances representing the nodes in the UMR graph.
-            self.triples (list[tuple]): A list of triples that will form the UMR graph.
+            self.variables (VariableAllocator): The allocator of unique variable names.
+            self.nodes_by_ud_node (dict): ud_node -> {UMRNode: None}, kept up to date by UMRNode.
+            self.nodes_by_var_name (dict): var_name -> {UMRNode: None}, kept up to date by UMRNode.
+            self.nodes_by_parent (dict): parent UMRNode -> {UMRNode: None}, kept up to date by UMRNode.
+            self.triples (TripleStore): The triples that will form the UMR graph, indexed by source, role and target.
             self.track_conj (dict): A dictionary tracking conjunctions in the graph.
             self.extra_level (dict): A mapping of UMR nodes to additional parent nodes, mostly for abstract roles.
 
         Args:
             ud_tree: The UD tree representing syntactic dependencies in the sentence.
-            deprels (dict): A dictionary mapping UD dependency relations to UMR roles.
+            roles (dict): A dictionary mapping UD nodes to UMR roles, as returned by preprocess.classify_roles().
             language (str): The langauge of the tree.
             vnaming (str): The naming convention for variable names, either 'first' or 'x'.
             rel_roles (set): lexical resource to disambiguate have-rel-role-92.
             advcls (dict): lexical resource to disambiguate adverbial clauses.
             modality (dict): lexical resource to disambiguate modal-strength and modal-predicate.
             conjunctions (dict): lexical resource to disambiguate coordinating conjunctions.
+            dispatcher (RuleDispatcher): the rules of UMRNode.ud_to_umr(), by default the ones of umr_node.DISPATCHER.
         """
         self.ud_tree = ud_tree
         self.sent_num = sent_num
-        self.deprels = deprels
+        self.roles = roles
+        self.ud_index = UDIndex(ud_tree)
+        self.dispatcher = dispatcher
         self.root_var = None
         self.nodes: list[UMRNode] = []
+        self.variables = VariableAllocator()
+        self.nodes_by_ud_node = {}
+        self.nodes_by_var_name = {}
+        self.nodes_by_parent = {}
         self.lang = language
         self.var_naming = vnaming
-        self.triples = []
+        self.triples = TripleStore()
         self.track_conj = {}
         self.extra_level = {}  # node: new_umr_parent, e.g. {var of ARG1: var of roleset-91}
         self.rel_roles = rel_roles
@@ -120,12 +117,30 @@ class UMRGraph:
     def __repr__(self):
         return f"Sentence(Text: '{self.ud_tree.text}', nodes={self.nodes})"
 
+    @staticmethod
+    def index_node(index, node, key):
+        """ Stores a node under key in one of the node indexes (nodes_by_ud_node, nodes_by_var_name, nodes_by_parent). """
+        index.setdefault(key, {})[node] = None
+
+    @staticmethod
+    def unindex_node(index, node, key):
+        """ Removes a node stored under key from one of the node indexes. """
+        nodes = index[key]
+        del nodes[node]
+        if not nodes:
+            del index[key]
+
+    @staticmethod
+    def lookup_nodes(index, key):
+        """ Returns the nodes stored under key in one of the node indexes, in the order in which they were created. """
+        return sorted(index.get(key, ()), key=lambda node: node.position)
+
     @property
     def variable_names(self):
         """
         Returns a list of 'var_name' values from each node in self.nodes.
         """
-        return [node.var_name for node in self.nodes if hasattr(node, 'var_name')]
+        return [node.var_name for node in self.nodes]
 
     def assign_variable_name(self, form):
         """
@@ -146,14 +161,8 @@ class UMRGraph:
         else:  # self.var_naming == 'x'
             first_char = 'x'
 
-        base_name = f"s{self.sent_num}{first_char}"
-        count = 2
-
         # ensure uniqueness
-        var_name = base_name
-        while var_name in self.variable_names:
-            var_name = f"{base_name}{count}"
-            count += 1
+        var_name = self.variables.allocate(f"s{self.sent_num}{first_char}")
 
         self.triples.append((var_name, 'instance', lemma))
 
@@ -167,35 +176,33 @@ class UMRGraph:
         Return a list of triples with corrected variable naming, if necessary.
         Corrects variable names by organizing them by letter, ensuring sequential numbering.
         """
-        var_pattern = re.compile(r"^([a-z])(\d+)([a-z])(\d*)$")
-
-        var_groups = {}
-
-        var_names = [v for v in self.variable_names if v == self.root_var or self.find_in_triples(v, 2) != -1]
-
-        for var in var_names:
-            match = var_pattern.match(var)
-            if match:
-                base_letter = match.group(3)
-                number = int(match.group(4)) if match.group(4) else 1
-                var_groups.setdefault(base_letter, []).append((number, var))
+        base_pattern = re.compile(r"^[a-z]\d+[a-z]$")
 
         renaming_map = {}
 
-        for base_letter, variables in var_groups.items():
-            variables.sort()
+        # names are allocated in increasing order, so each group is already sorted.
+        for base_name, allocated in self.variables.names_by_base.items():
+            if not base_pattern.match(base_name):
+                continue
+
+            variables = [v for v in allocated if v == self.root_var or self.find_in_triples(v, 2)]
+            base_renaming = {}
 
-            for new_number, (current_number, var) in enumerate(variables, start=1):
-                new_var = f"s{self.sent_num}{base_letter}{new_number if new_number > 1 else ''}"
+            for new_number, var in enumerate(variables, start=1):
+                new_var = f"{base_name}{new_number if new_number > 1 else ''}"
 
                 if new_var != var:
-                    renaming_map[var] = new_var
+                    base_renaming[var] = new_var
                     to_replace = UMRNode.find_by_var_name(self, new_var)
                     if to_replace:
                         to_replace.var_name = None
                     to_rename = UMRNode.find_by_var_name(self, var)
                     to_rename.var_name = new_var
 
+            if base_renaming:
+                self.variables.rename(base_name, base_renaming)
+                renaming_map.update(base_renaming)
+
         corrected_triples = [
             (renaming_map.get(var, var), relation, renaming_map.get(value, value))
             for var, relation, value in self.triples
@@ -204,8 +211,13 @@ class UMRGraph:
         return corrected_triples, renaming_map.get(self.root_var, self.root_var)
 
     def remove_duplicate_triples(self):
-        """ Removes duplicate triples from self.triples. """
-        self.triples = list(set(self.triples))
+        """ Removes duplicate triples from self.triples, keeping the first occurrence of each. """
+        self.triples = TripleStore(dict.fromkeys(self.triples))
+
+    @staticmethod
+    def is_valid_triple(tup):
+        """ A triple is invalid if it has the same parent and child, e.g. (A :role A), or if its source or role is missing. """
+        return tup[0] != tup[2] and tup[1] and tup[1] not in ['other', 'root'] and tup[0]
 
     def remove_invalid_triples(self):
         """
@@ -213,23 +225,22 @@ class UMRGraph:
         - with same parent and child, e.g. (A :role A),
         - where the parent is not a child in another triple, except for the root variable.
         """
-        self.triples = [tup for tup in self.triples if tup[0] != tup[2]]
-        self.triples = [tup for tup in self.triples if tup[1] and tup[1] not in ['other', 'root']]
-        self.triples = [tup for tup in self.triples if tup[0]]
+        self.triples = TripleStore(tup for tup in self.triples if self.is_valid_triple(tup))
+
+    def lacks_instance(self, tup):
+        """ Checks if the target of the triple is a variable without an instance triple. """
+        if tup[1].startswith('op') and not re.fullmatch(r's\d+[a-zA-Z]\d*', tup[2]) or tup[1] in ['refer-person', 'refer-number', 'aspect', 'modal-strength', 'instance', 'quant', 'polarity', 'mode']:
+            return False
+
+        var = tup[2]
+        # self-loops (var :instance var) are invalid triples, so they do not count as instance triples.
+        return not any(concept != var for _, _, concept in self.triples.select(source=var, role='instance'))
 
     def remove_invalid_variables(self):
         """ Iterates over the list of triples and checks if every variable has also an instance triple. """
-        var_pattern = r's\d+[a-zA-Z]\d*'
-
         for tup in self.triples:
-            if tup[1].startswith('op') and not re.fullmatch(var_pattern, tup[2]) or tup[1] in ['refer-person', 'refer-number', 'aspect', 'modal-strength', 'instance', 'quant', 'polarity', 'mode']:
-                continue
-            else:
-                var = tup[2]
-
-                # Check if there exists an instance triple for the given variable
-                if not any(t for t in self.triples if t[0] == var and t[1] == 'instance'):
-                    self.triples.remove(tup)
+            if self.lacks_instance(tup):
+                self.triples.remove(tup)
 
     def postprocessing_checks(self):
         """
@@ -242,86 +253,118 @@ class UMRGraph:
         """
         ##### relative clauses #####
         for node in self.nodes:
-            if hasattr(node, 'check_needed') and node.check_needed:
+            if node.check_needed:
                 removed_triple = self.find_and_remove_from_triples(node.var_name, 2, return_value=True)
 
                 if removed_triple:
                     for rt in removed_triple:
-                        for triple in self.triples:
-                            if triple[1] and triple[1].endswith('-of') and triple[2] == rt[0]:
+                        for triple in self.triples.select(target=rt[0]):
+                            if triple[1] and ROLES[triple[1]].is_inverted:
                                 new_role = node.role.split('-')[0] + '-of'
                                 self.triples.append((triple[0], new_role, triple[2]))
                                 self.triples.remove(triple)
                                 break
 
         ##### refer-number incorrectly assigned to NEs #####
-        for triple in self.triples:
-            if triple[1] == 'instance' and triple[2] == 'type-NE':
-                corresponding_triple = next(
-                    (t for t in self.triples if t[0] == triple[0] and t[1] == 'refer-number'),
-                    None
-                )
-                if corresponding_triple:
-                    self.triples.remove(corresponding_triple)
+        for triple in self.triples.select(role='instance', target='type-NE'):
+            corresponding_triple = self.triples.first(source=triple[0], role='refer-number')
+            if corresponding_triple:
+                self.triples.remove(corresponding_triple)
+
+    def disconnected_tops(self, dependencies):
+        """
+        Returns the top variables of the subgraphs that are not connected to the root variable.
+        Every variable is the source of (at least) its instance triple, so the top of a disconnected subgraph is a
+        variable that is not the child of any relation, other than the root. Cycles do not count as disconnections.
+
+        Args:
+            dependencies (dict): parent variable -> set of child variables, for all relation triples.
+        """
+        attached = set().union(*dependencies.values())
+        return {par for par, ed, ch in self.triples if par is not None and par != self.root_var and par not in attached}
 
     def avoid_disconnection(self):
+        """ Removes the subgraphs that are not connected to the root variable. """
         dependencies = defaultdict(set)
-        disconnecting = set()
 
         for tup in self.triples:
             par, ed, ch = tup
             if type_of_triple(tup) == 'relation':
                 dependencies[par].add(ch)
 
+        disconnecting = self.disconnected_tops(dependencies)
+        if disconnecting:
+            self.remove_orphans(disconnecting, dependencies)
+
+    def deduplicate(self):
+        """
+        Fused pass, equivalent to remove_duplicate_triples followed by remove_non_inverted_triples_if_duplicated:
+        non-inverted triples are filtered out while the deduplicated store is built.
+        """
+        unique = dict.fromkeys(self.triples)
+        self.triples = TripleStore(triple for triple in unique if not self.has_inverted_duplicate(triple, unique))
+
+    def cleanup(self):
+        """
+        Fused pass, equivalent to remove_invalid_triples, remove_invalid_variables and avoid_disconnection:
+        a single traversal drops invalid triples and dangling variables, and collects the dependencies used to find
+        disconnected subgraphs. The triples are swept a second time only if some subgraph is disconnected.
+        """
+        kept = []
+        dependencies = defaultdict(set)
+
         for tup in self.triples:
-            par, ed, ch = tup
-            res = has_parent_attached(par, dependencies, self.root_var)
-            if res:
-                disconnecting.add(res)
+            if not self.is_valid_triple(tup) or self.lacks_instance(tup):
+                continue
+            kept.append(tup)
+            if type_of_triple(tup) == 'relation':
+                dependencies[tup[0]].add(tup[2])
 
-        for node in disconnecting:
-            self.find_and_remove_from_triples(node, 0)
-            self.remove_orphans(node, dependencies)
+        self.triples = TripleStore(kept)
 
-    def to_penman(self):
+        disconnecting = self.disconnected_tops(dependencies)
+        if disconnecting:
+            self.remove_orphans(disconnecting, dependencies)
+
+    def to_penman(self, legacy=False):
         """
-        Transform the nested dictionary obtained from UD into a Penman graph.
+        Transform the nested dictionary obtained from UD into the triples of a Penman graph.
         First, delete 'instance' tuples if they are not associated with any roles,
         as well as other invalid triples (e.g. role is None).
+
+        Args:
+            legacy (bool): If True, run the original sequence of post-processing passes (LEGACY_PASSES) instead of the
+            fused one (PASSES). Both produce the same graph; the legacy sequence is kept for equivalence testing.
+
+        Returns:
+            tuple: The triples, in the order in which they are serialized, and the root variable.
         """
-        self.remove_duplicate_triples()
-        self.remove_non_inverted_triples_if_duplicated()
-        self.postprocessing_checks()
-        self.remove_invalid_triples()
-        self.remove_invalid_variables()
-        self.avoid_disconnection()
+        for postprocessing_pass in (self.LEGACY_PASSES if legacy else self.PASSES):
+            postprocessing_pass(self)
 
         corrected_triples, root = self.correct_variable_name()
-        triples = reorder_triples(corrected_triples)
-        g = penman.Graph(triples)
-        return g, root
+        return reorder_triples(corrected_triples), root
 
-    def remove_orphans(self, parent, stored_dependencies, visited=None):
+    def remove_orphans(self, parents, stored_dependencies):
         """
-        Recursively removes nodes that are disconnected from the graph.
+        Removes disconnected nodes from the graph, in a single sweep over the triples: the triples of the given parents,
+        and every triple involving one of their descendants.
 
         Args:
-            parent (str): The current node being checked.
+            parents (set): The top nodes of the disconnected subgraphs.
             stored_dependencies (dict): A dictionary representing the graph, where keys are parent nodes and values are
             sets of child nodes.
-            visited (set, optional): A set of nodes that have already been visited during the traversal, to prevent
-            cycles. Defaults to `None`.
         """
+        orphans = set()
+        to_visit = [child for parent in parents for child in stored_dependencies.get(parent, ())]
+        while to_visit:
+            child = to_visit.pop()
+            if child not in orphans:
+                orphans.add(child)
+                to_visit.extend(stored_dependencies.get(child, ()))
 
-        if visited is None:
-            visited = set()
-        if parent in visited:
-            return
-        visited.add(parent)
-
-        for child in list(stored_dependencies.get(parent, [])):
-            self.triples = [tup for tup in self.triples if tup[0] != child and tup[2] != child]
-            self.remove_orphans(child, stored_dependencies, visited)
+        self.triples = TripleStore(tup for tup in self.triples
+                                   if tup[0] not in parents and tup[0] not in orphans and tup[2] not in orphans)
 
     def find_in_triples(self, variable, position):
         """
@@ -329,16 +372,14 @@ class UMRGraph:
 
         Args:
             variable: the value to compare against the n element of each triple.
-            position: the position (1, 2, 3) of the element to compare against.
+            position: the position (0, 1, 2) of the element to compare against.
 
         Returns:
-        int: The index of the first triple with the specified element equal to the given variable,
-             or -1 if no such element is found.
+        tuple: The first non-instance triple with the specified element equal to the given variable,
+             or None if no such triple is found.
         """
-        for i, triple in enumerate(self.triples):
-            if variable == triple[position] and triple[1] != 'instance':
-                return i
-        return -1
+        return next((triple for triple in self.triples.select(**{POSITIONS[position]: variable})
+                     if triple[1] != 'instance'), None)
 
     def find_and_remove_from_triples(self, variable, position, return_value=False):
         """
@@ -350,9 +391,7 @@ class UMRGraph:
             position: The position (0, 1, 2) of the element to compare against.
             return_value: If True, the matching triples are returned as a list.
         """
-        matching_triples = [triple for triple in self.triples if triple[position] == variable]
-
-        self.triples = [triple for triple in self.triples if triple[position] != variable]
+        matching_triples = self.triples.remove_where(**{POSITIONS[position]: variable})
 
         if return_value:
             return matching_triples
@@ -369,96 +408,66 @@ class UMRGraph:
             position_2: The position (0, 1, 2) of the element to replace.
         """
         called = False
-        for i, triple in enumerate(self.triples):
-            if triple[position] == variable_to_find:
-                called=True
-                modified_triple = list(triple)
-                modified_triple[position_2] = replacement
-                self.triples[i] = tuple(modified_triple)
+        for i, triple in self.triples.items(**{POSITIONS[position]: variable_to_find}):
+            called=True
+            modified_triple = list(triple)
+            modified_triple[position_2] = replacement
+            self.triples[i] = tuple(modified_triple)
 
         return called
 
+    @staticmethod
+    def has_inverted_duplicate(triple, triples):
+        """ Checks if the non-inverted triple (a, role, b) has a corresponding inverted version (b, role-of, a) in triples. """
+        a, role, b = triple
+        info = ROLES[role]
+        return info.invertible and (b, info.inverse, a) in triples
+
     def remove_non_inverted_triples_if_duplicated(self):
         """
         Modifies self.triples by removing any non-inverted triples that have a corresponding inverted version.
         A pair is defined as (a, role, b) and (b, role-of, a), where the non-inverted triple (a, role, b) is removed.
         """
-        to_remove = set()
-        ignored_roles = ['other', 'refer-number', 'refer-person', 'aspect', 'instance', 'mode', 'modal-strength']
+        to_remove = {triple for triple in self.triples if self.has_inverted_duplicate(triple, self.triples)}
+        self.triples = TripleStore(triple for triple in self.triples if triple not in to_remove)
 
-        for triple in self.triples:
-            a, role, b = triple
-            if role and role not in ignored_roles:
-                if not role.endswith('-of'):
-                    inverted_role = f"{role}-of"
-                    inverted_triple = (b, inverted_role, a)
-                    if inverted_triple in self.triples:
-                        to_remove.add(triple)
-
-        self.triples = [triple for triple in self.triples if triple not in to_remove]
+    # Post-processing passes run by to_penman(), in order. Each pass is a function taking the graph and updating its
+    # triples in place, so sequences can be composed freely.
+    LEGACY_PASSES = (remove_duplicate_triples, remove_non_inverted_triples_if_duplicated, postprocessing_checks,
+                     remove_invalid_triples, remove_invalid_variables, avoid_disconnection)
+    PASSES = (deduplicate, postprocessing_checks, cleanup)
 
     def alignments(self, umr, output_file=None):
         """
-        Computes the alignment block based on UD tokens.
-        Raises a warning if there are two UMR nodes aligned to the same token.
+        Prints the alignment block based on UD tokens, for the variables of the given triples (see alignment).
         """
         destination = output_file if output_file else sys.stdout
-        alignments = {}
-
-        def format_range(index_list):
-            """ Formats a list of integers into a compact range representation of alignments. """
-            index_list.sort()
-            a_range = []
-            start = index_list[0]
-            end = start
-
-            for num in index_list[1:]:
-                if num == end + 1:
-                    end = num
-                else:
-                    a_range.append(f"{start}-{end}" if start != end else f"{start}-{start}")
-                    start = end = num
-
-            a_range.append(f"{start}-{end}" if start != end else f"{start}-{start}")
-            return ", ".join(a_range)
-
-        for v in umr.variables():
-            node = UMRNode.find_by_var_name(self, v)
-            num_token = node.ord if node else 0
-            aligned = [num_token]
+        for line in self.alignment(umr).lines():
+            print(line, file=destination)
 
-            if not isinstance(node.ud_node, str) and node.ud_node:
-                # Alignment of auxiliary verbs to the main verb
-                auxs = [c.ord for c in node.ud_node.children if c.udeprel == 'aux']
-                # Alignment of SCONJ marks to the main verb -- comment out next line not to align SCONJs
-                sconjs = [c.ord for c in node.ud_node.children if c.udeprel == 'mark' and c.upos == 'SCONJ']
-                # Alignment of adpositions and articles to the parent noun; # comment out next line not to align them
-                adps = [c.ord for c in node.ud_node.children if c.udeprel == 'case' or
-                        (c.feats['PronType'] == 'Art' and c.udeprel == 'det')]
-
-                aligned.extend(auxs + sconjs + adps)
-                if num_token == '0-0':
-                    aligned.remove(num_token)
-
-            alignments[v] = format_range(aligned)
-
-        sorted_alignments = dict(sorted(alignments.items(), key=lambda item: int(item[1].split('-')[0])))
-        for var, al in sorted_alignments.items():
-            print(f'{var}: {al}', file=destination)
-
-        # Check that two variables are not aligned to a same UD token
-        non_zero_values = [value for value in alignments.values() if value != '0-0']
-        seen_values = set()
-        for value in non_zero_values:
-            numbers = set([num for v in value.split(', ') for num in v.split('-')])
-            for num in numbers:
-                if num in seen_values:
-                    result = [int(num) for v in alignments.values() for part in alignments[v].split(',') for num in part.split('-')]
-                    dup = [v for v in alignments if num in result]
-                    warning_message = (
-                        f"[Warning] Two variables aligned to the same token: {dup} in sentence {self.ud_tree.address()}"
-                    )
-                    warnings.warn(warning_message)
-                seen_values.add(num)
+    def alignment(self, umr):
+        """
+        Computes the alignment of the variables of the given triples to UD tokens, in a single pass over the variables:
+        each variable is aligned to the token of its node and to the function words attached to it (see
+        alignment.function_word_ords), looked up in the node and UD indexes.
+        Raises a warning if there are two UMR nodes aligned to the same token.
+
+        Returns:
+            Alignment: variable -> sorted token spans.
+        """
+        spans = {}
+        for v in dict.fromkeys(source for source, _, _ in umr):
+            nodes = self.nodes_by_var_name.get(v)
+            node = min(nodes, key=lambda n: n.position) if nodes else None
+            if node is None:
+                spans[v] = [(0, 0)]
+                continue
 
+            aligned = [node.ord]
+            if not isinstance(node.ud_node, str) and node.ud_node:
+                aligned += function_word_ords(self.ud_index, node.ud_node)
+            spans[v] = token_spans(aligned)
 
+        alignment = Alignment(spans, self.ud_tree.address())
+        alignment.check()
+        return alignment
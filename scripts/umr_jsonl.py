@@ -0,0 +1,59 @@
+"""
+JSON Lines output of the converter (--format jsonl): one record per sentence, written straight from the UMRGraph, so
+that downstream tools can read the triples and alignments back without parsing the Penman notation.
+
+Each record has the keys:
+    sent_id (str): The address of the UD tree.
+    sent_num (int): The progressive number of the sentence, i.e. the prefix of its variable names.
+    text (str): The text of the sentence.
+    root (str): The root variable of the graph.
+    triples (list): The [source, role, target] triples of the graph, in the order returned by UMRGraph.to_penman()
+        (role priority, then creation order), not the Penman layout order of the .umr output.
+    alignments (dict): variable -> list of [first, last] token spans (1-based, inclusive), in the order of the .umr
+        output; variables that are not aligned to any token have the span [0, 0].
+    input_hash (str): The input hash of the sentence, only with --input_hashes.
+"""
+import json
+from block_writer import open_text
+
+
+def render_record(tree, sent_tree, umr, root, sent_num) -> str:
+    """
+    Renders the record of a sentence as a JSON line. Takes the same arguments as print_structure.render_structure().
+    Unlike the .umr output, the triples are not laid out as a Penman graph, so none of them are left out.
+    """
+    record = {
+        'sent_id': tree.address(),
+        'sent_num': sent_num,
+        'text': tree.text,
+        'root': root if umr else sent_tree.root_var,
+        'triples': umr,
+        'alignments': sent_tree.alignment(umr).spans,
+    }
+    return json.dumps(record, ensure_ascii=False) + '\n'
+
+
+def add_record_hash(record, key):
+    """ Adds the input hash of a sentence (see ConversionCache.key) to its record, as the last key. """
+    if key is None:
+        return record
+    return f'{record[:-2]}, "input_hash": "{key}"}}\n'
+
+
+def read_record(line):
+    """ Parses a JSON line into a record, with triples and token spans as tuples. """
+    record = json.loads(line)
+    record['triples'] = [tuple(triple) for triple in record['triples']]
+    record['alignments'] = {var: [tuple(span) for span in spans] for var, spans in record['alignments'].items()}
+    return record
+
+
+def load_records(path):
+    """
+    Yields the records of a JSON Lines output of the converter, one sentence at a time.
+    Compressed outputs (--compress) are decompressed on the fly.
+    """
+    with open_text(path) as f:
+        for line in f:
+            if line.strip():
+                yield read_record(line)
@@ -1,25 +1,28 @@
-from penman.models.amr import model as pm
 from preprocess import translate_number, is_number
+from rule_dispatcher import Rule, RuleDispatcher
+from vocabulary import ROLES, invert_triple
 
-def type_of_triple(triple):
-    """
-    Returns the type of the edge in the triple, which can be 'instance', 'attribute', 'relation'.
-    """
-    parent, edge, child = triple
-    if edge == 'instance':
-        return edge
-    elif edge in ['mode', 'modal-strength', 'aspect', 'refer-number', 'refer-person']:
-        return 'attribute'
-    elif edge == 'quant' or edge.startswith('op'):
-        # child is a variable or a constant?
-        if isinstance(child, int) or (child.startswith('"') and child.endswith('"')):
-            return 'attribute'
+# Bits of UMRNode._flags.
+ALREADY_ADDED, CHECK_NEEDED, EXTRA_LEVEL, ENTITY, REPLACE, REPLACED = (1 << i for i in range(6))
+
+
+def flag(bit, doc):
+    """ A boolean attribute of UMRNode, stored as a bit of UMRNode._flags. """
+    def get(self):
+        return bool(self._flags & bit)
+
+    def set(self, value):
+        if value:
+            self._flags |= bit
         else:
-            return 'relation'
-    else:
-        return 'relation'
+            self._flags &= ~bit
+
+    return property(get, set, doc=doc)
+
 
 class UMRNode:
+    __slots__ = ('umr_graph', 'position', '_ud_node', 'role', '_var_name', '_parent', 'ord', '_flags')
+
     def __init__(self, ud_node, umr_graph, role: str = "", already_added=False):
         """
         Initializes a UMRNode instance, which is automatically added to the UMRGraph upon initialization.
@@ -37,50 +40,77 @@ class UMRNode:
             self.var_name (str): A unique variable name assigned to the node, generated by the UMRGraph.
             self.parent (Optional[UMRNode]): The parent UMRNode of this node; initialized as None and set during processing.
             self.ord: The numerical id of the respective UD node, if available, else 0.
+            self.position (int): The position of the node in umr_graph.nodes, i.e. the order of creation.
             self.already_added (bool): Tracks whether this node has been added to the graph to prevent duplicates.
             self.check_needed (bool): A flag indicating if further checks are required for this node; initialized as False.
             self.extra_level (bool): A flag indicating if the node is involved in an abstract roleset construction; initialized as False.
             self.entity (bool): A flag indicating if the node will have to be replaced since it is ane entity; initialized as False.
             self.replace (bool): A flag indicating if the node has to be replaced (for modals); initialized as False.
             self.replaced (bool): A flag indicating if the node (entity) has already been replaced; initialized as False.
+
+        ud_node, var_name and parent are properties: assigning them keeps the node indexes of the UMRGraph up to date.
+        The boolean flags are stored as the bits of a single integer, self._flags.
             """
-        self.ud_node = ud_node
         self.umr_graph = umr_graph
+        self.position = len(umr_graph.nodes)
+        self._ud_node = ud_node
+        umr_graph.index_node(umr_graph.nodes_by_ud_node, self, ud_node)
         self.role = role
-        self.var_name = self.umr_graph.assign_variable_name(ud_node)
-        self.parent = None
+        self._var_name = umr_graph.assign_variable_name(ud_node)
+        umr_graph.index_node(umr_graph.nodes_by_var_name, self, self._var_name)
+        self._parent = None
+        umr_graph.index_node(umr_graph.nodes_by_parent, self, None)
         self.ord = self.ud_node.ord if not (isinstance(self.ud_node, str) and self.ud_node) else 0
-        self.already_added = already_added
-        self.check_needed = False
-        self.extra_level = False
-        self.entity = False
-        self.replace = False
-        self.replaced = False
-        self.umr_graph.nodes.append(self)
-        self.lang = self.umr_graph.lang
-
+        self._flags = ALREADY_ADDED if already_added else 0
+        umr_graph.nodes.append(self)
+
+    already_added = flag(ALREADY_ADDED, "Whether the node has already been added to the graph.")
+    check_needed = flag(CHECK_NEEDED, "Whether further checks are required for the node.")
+    extra_level = flag(EXTRA_LEVEL, "Whether the node is involved in an abstract roleset construction.")
+    entity = flag(ENTITY, "Whether the node will have to be replaced since it is an entity.")
+    replace = flag(REPLACE, "Whether the node has to be replaced (for modals).")
+    replaced = flag(REPLACED, "Whether the node (entity) has already been replaced.")
+
+    @property
+    def ud_node(self):
+        return self._ud_node
+
+    @ud_node.setter
+    def ud_node(self, ud_node):
+        index = self.umr_graph.nodes_by_ud_node
+        self.umr_graph.unindex_node(index, self, self._ud_node)
+        self._ud_node = ud_node
+        self.umr_graph.index_node(index, self, ud_node)
+
+    @property
+    def var_name(self):
+        return self._var_name
+
+    @var_name.setter
+    def var_name(self, var_name):
+        index = self.umr_graph.nodes_by_var_name
+        self.umr_graph.unindex_node(index, self, self._var_name)
+        self._var_name = var_name
+        self.umr_graph.index_node(index, self, var_name)
+
+    @property
+    def parent(self):
+        return self._parent
+
+    @parent.setter
+    def parent(self, parent):
+        index = self.umr_graph.nodes_by_parent
+        self.umr_graph.unindex_node(index, self, self._parent)
+        self._parent = parent
+        self.umr_graph.index_node(index, self, parent)
 
     def __repr__(self):
         return (f"Node(token='{self.ud_node if not isinstance(self.ud_node, str) else self.ud_node}', "
                 f"role='{self.role}', var_name='{self.var_name}', extra_level={self.extra_level}, "
-                f"parent={self.parent.var_name if hasattr(self.parent, 'var_name') else self.parent}')")
+                f"parent={self.parent.var_name if isinstance(self.parent, UMRNode) else self.parent}')")
 
     @classmethod
     def find_by_ud_node(cls, umr_graph, ud_node):
-        """
-        Retrieve the UMRNode instance based on the given ud_node.
-
-        Args:
-            umr_graph (UMRGraph): The UMRGraph instance to search within.
-            ud_node: The UD node to search for.
-
-        Returns:
-            UMRNode: The UMRNode instance with the matching ud_node, or None if not found.
-        """
-        # for node in umr_graph.nodes:
-        #     if node.ud_node == ud_node:
-        #         return node
-        # return None
         """
         Retrieve all UMRNode instances based on the given ud_node.
 
@@ -91,11 +121,7 @@ class UMRNode:
         Returns:
             List[UMRNode]: A list of UMRNode instances with the matching ud_node, or an empty list if not found.
         """
-        matching_nodes = []
-        for node in umr_graph.nodes:
-            if node.ud_node == ud_node:
-                matching_nodes.append(node)
-        return matching_nodes
+        return umr_graph.lookup_nodes(umr_graph.nodes_by_ud_node, ud_node)
 
     @classmethod
     def find_by_var_name(cls, umr_graph, var_name):
@@ -109,10 +135,8 @@ class UMRNode:
         Returns:
             UMRNode: The UMRNode instance with the matching var_name, or None if not found.
         """
-        for node in umr_graph.nodes:
-            if node.var_name == var_name:
-                return node
-        return None
+        nodes = umr_graph.lookup_nodes(umr_graph.nodes_by_var_name, var_name)
+        return nodes[0] if nodes else None
 
     @classmethod
     def find_children_by_parent(cls, umr_graph, parent_node):
@@ -126,11 +150,7 @@ class UMRNode:
         Returns:
             list: A list of UMRNode instances whose parent is the given parent_node.
         """
-        children = []
-        for node in umr_graph.nodes:
-            if node.parent == parent_node:
-                children.append(node)
-        return children
+        return umr_graph.lookup_nodes(umr_graph.nodes_by_parent, parent_node)
 
     @classmethod
     def reattach_dependents(cls, umr_graph, old_parent, new_parent, remove=False, relaxed=False):
@@ -155,11 +175,8 @@ class UMRNode:
                 d.parent = new_parent
                 if remove:
                     umr_graph.find_and_replace_in_triples(d.var_name, 2, new_parent.var_name, 0)
-                    umr_graph.triples = [
-                        (new_parent.var_name, tup[1], tup[2]) if tup[0] == old_parent.var_name and tup[1] == 'relation'
-                        else tup
-                        for tup in umr_graph.triples
-                    ]
+                    for i, tup in umr_graph.triples.items(source=old_parent.var_name, role='relation'):
+                        umr_graph.triples[i] = (new_parent.var_name, tup[1], tup[2])
 
     def introduce_abstract_roleset(self, role_aka_concept):
         """
@@ -176,7 +193,7 @@ class UMRNode:
         self.umr_graph.find_and_remove_from_triples(role_aka_concept, 1)
         concept = UMRNode(role_aka_concept, self.umr_graph, already_added=True)
         self.umr_graph.triples.extend([
-            pm.invert((concept.var_name, 'ARG1', self.parent.var_name)),
+            invert_triple((concept.var_name, 'ARG1', self.parent.var_name)),
             (concept.var_name, 'ARG2', self.var_name),
         ])
         concept.aspect('state')
@@ -216,7 +233,7 @@ class UMRNode:
         if self.umr_graph.root_var == self.parent.var_name:
             self.umr_graph.root_var = concept.var_name
 
-        nsubj = next((s for s in self.ud_node.parent.children if s.udeprel in ['nsubj', 'csubj']), None)
+        nsubj = next((s for s in self.umr_graph.ud_index.children(self.ud_node.parent) if s.udeprel in ['nsubj', 'csubj']), None)
         nsubj_node = None
         if nsubj:
             if overt:
@@ -229,7 +246,7 @@ class UMRNode:
                     nsubj_node = nsubj_nodes[0]
                 self.umr_graph.find_and_remove_from_triples(self.var_name, 2)
                 concept.ud_node = self.ud_node
-                concept.ud_node.deprel = self.ud_node.parent.deprel
+                self.umr_graph.ud_index.set_deprel(concept.ud_node, self.ud_node.parent.deprel)
 
             else:
                 nsubj_node = self
@@ -237,19 +254,14 @@ class UMRNode:
             nsubj_node.extra_level = True
             nsubj_node.parent = concept
 
-        for i, tup in enumerate(self.umr_graph.triples):
-            if tup[2] == self.parent.var_name:
-                self.umr_graph.triples[i] = (tup[0], tup[1], concept.var_name)
-            if nsubj and not nsubj_node.extra_level:
-                self.umr_graph.find_and_remove_from_triples(nsubj_node.var_name, 2)
+        for i, tup in self.umr_graph.triples.items(target=self.parent.var_name):
+            self.umr_graph.triples[i] = (tup[0], tup[1], concept.var_name)
+        if nsubj and not nsubj_node.extra_level:
+            self.umr_graph.find_and_remove_from_triples(nsubj_node.var_name, 2)
 
         if nsubj:
             if nsubj not in self.umr_graph.track_conj:
-                check = [tup for tup in self.umr_graph.triples if tup[1] == 'actor']
-                if check:
-                    for tup in check:
-                        if tup[2] == nsubj_node.var_name:
-                            self.umr_graph.triples.remove(tup)
+                self.umr_graph.triples.remove_where(role='actor', target=nsubj_node.var_name)
                 self.umr_graph.triples.append((concept.var_name, 'ARG1', nsubj_node.var_name))
                 nsubj_node.parent = concept
                 if not nsubj_node.extra_level:
@@ -259,11 +271,7 @@ class UMRNode:
                         self.parent.get_number_person('number')
                 else:
                     parent = UMRNode.find_by_ud_node(self.umr_graph, nsubj.parent)[0]
-                    check = [tup for tup in self.umr_graph.triples if tup[1] == 'undergoer']
-                    if check:
-                        for tup in check:
-                            if tup[2] == parent.var_name:
-                                self.umr_graph.triples.remove(tup)
+                    self.umr_graph.triples.remove_where(role='undergoer', target=parent.var_name)
                     self.umr_graph.triples.append((concept.var_name, second_arg, parent.var_name))
                     parent.parent = concept
                     if parent.ud_node.upos == 'NOUN':
@@ -298,7 +306,7 @@ class UMRNode:
         UMRNode.reattach_dependents(self.umr_graph, self.parent, concept, remove=True, relaxed=relaxed)
 
         # elided subjects to be restored
-        rel_dep = [s for s in self.ud_node.siblings if s.deprel == 'acl:relcl']
+        rel_dep = self.umr_graph.ud_index.siblings(self.ud_node, deprel='acl:relcl')
         if overt and nsubj is None and not rel_dep:
             arg_type = 'person' if self.ud_node.feats['Person'] in ['1', '2'] else 'FILL'
             new_node = self.create_node(arg_type)
@@ -327,11 +335,11 @@ class UMRNode:
         else:
             parent = def_parent
 
-        if self.umr_graph.find_in_triples(self.var_name, 2) == -1:
+        if not self.umr_graph.find_in_triples(self.var_name, 2):
             if not invert:
                 self.umr_graph.triples.append((parent, role, self.var_name))
             else:
-                self.umr_graph.triples.append(pm.invert((self.var_name, role, parent)))
+                self.umr_graph.triples.append(invert_triple((self.var_name, role, parent)))
             self.already_added = True
 
         elif self.extra_level:
@@ -339,15 +347,18 @@ class UMRNode:
             if not invert:
                 self.umr_graph.triples.append((grandparent.var_name, role, self.parent.var_name))
             else:
-                self.umr_graph.triples.append(pm.invert((self.parent.var_name, role, grandparent.var_name)))
+                self.umr_graph.triples.append(invert_triple((self.parent.var_name, role, grandparent.var_name)))
                 self.already_added = True
 
         else:
             pass # it should be already okay
 
     def ud_to_umr(self):
-        """ Map UD information to UMR structures. """
-        root_var = None
+        """
+        Map UD information to UMR structures.
+        The node is handled by the first rule it matches in UPOS_RULES, then by the first rule it matches in
+        DEPREL_RULES (see RuleDispatcher).
+        """
 
         if not self.already_added:
 
@@ -358,95 +369,8 @@ class UMRNode:
                 if not self.umr_graph.root_var:
                     self.umr_graph.root_var = self.var_name
 
-            ########## check by UPOS ##########
-            if self.ud_node.upos == 'PRON':
-                self.entity = True
-
-            elif self.ud_node.upos == 'DET':
-                self.determiners_initial()
-
-            elif self.ud_node.upos == 'ADJ':
-                self.hidden_event()
-
-            elif self.ud_node.upos == 'VERB':
-                # elided subjects to be restored
-                if not any(d.udeprel in {'nsubj', 'csubj'} for d in self.ud_node.children) and self.ud_node.deprel != 'xcomp':
-                    if self.ud_node.feats['Voice'] != 'Pass' and self.ud_node.feats['VerbForm'] != 'Part':
-                        arg_type = 'person' if self.ud_node.feats['Person'] in ['1', '2'] else 'FILL'
-                        new_node = self.create_node(arg_type)
-                        self.umr_graph.triples.append((self.var_name, 'actor', new_node.var_name))
-
-                self.modality()
-                self.aspect()
-                self.mode()
-
-            elif self.ud_node.upos == 'PROPN':
-                self.entity = True
-
-            elif self.ud_node.upos in ['ADJ', 'ADV'] and self.ud_node.feats['Degree']:
-                if not [c for c in self.ud_node.children if c.deprel == 'cop']:
-                    self.have_degree()
-
-            ########## check by deprel ##########
-            if self.ud_node.udeprel == 'nummod' or self.ud_node.sdeprel in ['nummod', 'numgov']:
-                self.quantities()
-
-            elif self.ud_node.deprel == 'conj':
-                role = next((k for k, v in self.umr_graph.deprels.items() for item in v if item == self.ud_node.parent), None)
-                root_var = self.coordination(role)
-
-            elif self.ud_node.udeprel in ['csubj', 'ccomp', 'xcomp']:
-                self.clauses()
-
-            elif self.ud_node.deprel == 'nmod':
-                if self.ud_node.parent.feats['VerbForm'] == 'Part':
-                    self.add_node('OBLIQUE')
-                else:
-                    self.add_node(self.role)
-
-            elif self.ud_node.deprel == 'appos':
-                _ = self.introduce_abstract_roleset(self.role)
-
-            elif self.ud_node.deprel == 'cop':
-                self.copulas()
-
-            # copular constructions with no overt copula
-            elif self.ud_node.deprel == 'nsubj' and self.ud_node.parent.upos != 'VERB' and not [s for s in self.ud_node.siblings if s.deprel == 'cop']:
-                self.copulas(copula=False)
-
-            elif self.ud_node.deprel == 'acl:relcl':
-                rel_pron = next((d for d in self.ud_node.descendants if 'Rel' in d.feats.get('PronType')), None)
-                if not rel_pron:
-                    if 'Rel' in self.ud_node.feats.get('PronType'):
-                        rel_pron = self.ud_node
-                    elif 'Rel' in self.ud_node.parent.feats.get('PronType'):
-                        rel_pron = self.ud_node.parent
-                    else:
-                        rel_pron = next((d for d in self.ud_node.descendants if d.upos == 'PRON' and d.feats['PronType'] != 'Prs'), None)
-                        if not rel_pron:
-                            rel_pron = next((d for d in self.ud_node.descendants if d.upos == 'ADV'), None)
-
-                if rel_pron:
-                    rel_pron_nodes = UMRNode.find_by_ud_node(self.umr_graph, rel_pron)
-                    if rel_pron_nodes:
-                        rel_pron_node = rel_pron_nodes[0]
-                        self.relative_clauses(rel_pron_node)
-                        rel_pron_node.already_added = True
-
-            elif self.ud_node.deprel == 'acl':
-                self.acl_participles()
-
-            elif self.ud_node.udeprel == 'advcl':
-                self.adverbial_clauses()
-
-            elif self.ud_node.udeprel == 'compound' or self.ud_node.deprel == 'expl:pv':
-                self.compound()
-
-            elif self.ud_node.udeprel == 'fixed':
-                self.fixed()
-
-            elif self.ud_node.udeprel == 'flat':
-                self.parent.named_entities()
+            self.umr_graph.dispatcher.dispatch(self, BY_UPOS)
+            self.umr_graph.dispatcher.dispatch(self, BY_DEPREL)
 
             if not self.already_added:
                 self.add_node(self.role)
@@ -454,7 +378,60 @@ class UMRNode:
                         (self.ud_node.upos == 'ADJ' and self.ud_node.udeprel in ['nsubj', 'obj', 'obl'])):
                     self.get_number_person('number')
 
-        self.umr_graph.root_var = root_var if root_var else self.umr_graph.root_var
+    def mark_entity(self):
+        """ Marks the node as an entity, to be replaced after all relations have been created (see replace_entities). """
+        self.entity = True
+
+    def predicates(self):
+        """ Restores the elided subject of a verb, and assigns it modality, aspect and mode. """
+        if not any(d.udeprel in {'nsubj', 'csubj'} for d in self.umr_graph.ud_index.children(self.ud_node)) and self.ud_node.deprel != 'xcomp':
+            if self.ud_node.feats['Voice'] != 'Pass' and self.ud_node.feats['VerbForm'] != 'Part':
+                arg_type = 'person' if self.ud_node.feats['Person'] in ['1', '2'] else 'FILL'
+                new_node = self.create_node(arg_type)
+                self.umr_graph.triples.append((self.var_name, 'actor', new_node.var_name))
+
+        self.modality()
+        self.aspect()
+        self.mode()
+
+    def degree(self):
+        """ Handles ADJs and ADVs with a degree, unless they are part of a copular construction. """
+        if not self.umr_graph.ud_index.children(self.ud_node, deprel='cop'):
+            self.have_degree()
+
+    def conjuncts(self):
+        """ Handles a conjunct, moving the root of the graph to the coordination if needed. """
+        role = self.umr_graph.roles.get(self.ud_node.parent)
+        root_var = self.coordination(role)
+        if root_var:
+            self.umr_graph.root_var = root_var
+
+    def nominal_modifiers(self):
+        """ Handles nmod dependents, which are obliques of participles. """
+        if self.ud_node.parent.feats['VerbForm'] == 'Part':
+            self.add_node('OBLIQUE')
+        else:
+            self.add_node(self.role)
+
+    def relative_clause_heads(self):
+        """ Handles the head of a relative clause, looking for the relative pronoun (or adverb) it contains. """
+        rel_pron = self.umr_graph.ud_index.first_descendant(self.ud_node, 'rel_pron')
+        if not rel_pron:
+            if 'Rel' in self.ud_node.feats.get('PronType'):
+                rel_pron = self.ud_node
+            elif 'Rel' in self.ud_node.parent.feats.get('PronType'):
+                rel_pron = self.ud_node.parent
+            else:
+                rel_pron = self.umr_graph.ud_index.first_descendant(self.ud_node, 'pron')
+                if not rel_pron:
+                    rel_pron = self.umr_graph.ud_index.first_descendant(self.ud_node, 'adv')
+
+        if rel_pron:
+            rel_pron_nodes = UMRNode.find_by_ud_node(self.umr_graph, rel_pron)
+            if rel_pron_nodes:
+                rel_pron_node = rel_pron_nodes[0]
+                self.relative_clauses(rel_pron_node)
+                rel_pron_node.already_added = True
 
     def create_node(self, category: str, role: str = "", replace: bool = False, reflex: bool = False):
         """
@@ -485,7 +462,7 @@ class UMRNode:
         if replace:
             triples = self.umr_graph.find_and_remove_from_triples(self.var_name, 0, return_value=True)
             for t in triples:
-                if t[1] and (t[1].endswith('-of') or t[1] != 'instance'):
+                if t[1] and (ROLES[t[1]].is_inverted or t[1] != 'instance'):
                     self.umr_graph.triples.append(t)
             self.umr_graph.find_and_replace_in_triples(self.var_name, 0, new_node.var_name, 0)
             if new_node.role == self.role:
@@ -534,7 +511,7 @@ class UMRNode:
     def aspect(self, value=None):
         """ Assign aspect attribute. """
 
-        already = [tup for tup in self.umr_graph.triples if tup[0] == self.var_name and tup[1] == 'aspect']
+        already = self.umr_graph.triples.select(source=self.var_name, role='aspect')
         if not already:
 
             if not value:
@@ -549,8 +526,8 @@ class UMRNode:
         """ Checks if the predicate qualifies for negative modal-strength based on syntactic elements like negation. """
 
         if hasattr(self.ud_node, 'children'):
-            negation = [c for c in self.ud_node.children if c.deprel == 'advmod:neg']
-            neg_element = [c for c in self.ud_node.children if c.feats['Polarity'] == 'Neg' and c.upos != 'VERB']
+            negation = self.umr_graph.ud_index.children(self.ud_node, deprel='advmod:neg')
+            neg_element = [c for c in self.umr_graph.ud_index.children(self.ud_node) if c.feats['Polarity'] == 'Neg' and c.upos != 'VERB']
             neg_token = self.ud_node.feats['Polarity'] == 'Neg'
             return len(negation) > 0 or len(neg_element) > 0 or neg_token
 
@@ -568,14 +545,14 @@ class UMRNode:
         modal-predicate.
         """
 
-        already = [tup for tup in self.umr_graph.triples if tup[0] == self.var_name and tup[1] == 'modal-strength']
+        already = self.umr_graph.triples.select(source=self.var_name, role='modal-strength')
 
         # if modal-strength has not been assigned yet
         if not already:
 
             if self.umr_graph.modals:
                 if hasattr(self.ud_node, 'lemma'):
-                    if [el for el in self.umr_graph.modals["lexical"] if el["lemma"] == self.ud_node.lemma and el["replace"] == "yes"]:
+                    if any(el["replace"] == "yes" for el in self.umr_graph.modals["lexical"].get(self.ud_node.lemma, [])):
                         self.umr_graph.find_and_remove_from_triples(self.var_name, 0)
                         self.already_added = True
                         return
@@ -583,9 +560,9 @@ class UMRNode:
                 if self.parent and hasattr(self.parent.ud_node, 'lemma') and hasattr(self.ud_node, 'deprel') and self.ud_node.deprel in ['csubj', 'ccomp', 'xcomp']:
                     # first, checking external file for modality - lexical check based on lemma.
                     value, replace = next(
-                        ((el["modal-strength"], el["replace"]) for el in self.umr_graph.modals["lexical"]
-                         if el["lemma"] == self.parent.ud_node.lemma
-                         and (el["constraint"] is None or eval(el["constraint"]))),
+                        ((el["modal-strength"], el["replace"])
+                         for el in self.umr_graph.modals["lexical"].get(self.parent.ud_node.lemma, [])
+                         if el["constraint"] is None or el["constraint"](self)),
                         (None, None)
                     )
                     if value and value.split('-')[1] != 'negative':  # cases like forbid
@@ -593,8 +570,8 @@ class UMRNode:
 
                     if value and replace == 'yes':
                         self.parent.replace = True
-                        for i, tup in enumerate(self.umr_graph.triples):
-                            if tup[0] == self.var_name and tup[1] in ['aspect', 'modal-strength']:
+                        for i, tup in self.umr_graph.triples.items(source=self.var_name):
+                            if tup[1] in ['aspect', 'modal-strength']:
                                 del self.umr_graph.triples[i]
                         if self.parent.is_negated():
                             polarity = 'negative' if value.split('-')[1] == 'affirmative' else 'affirmative'
@@ -611,21 +588,20 @@ class UMRNode:
                 # then, checking external file for modality - grammatical check based on construction.
                 if not value and hasattr(self.ud_node, 'upos'):
                     for el in self.umr_graph.modals["grammatical"]:
-                        feats_from_el = el['node.feats'].split('|')
-                        if el["node.upos"] == self.ud_node.upos and eval(el["constraint_on_children"]):
-                            if all(feat in str(self.ud_node.feats).split('|') for feat in feats_from_el):
+                        if el["node.upos"] == self.ud_node.upos and (el["constraint_on_children"] is None or
+                                                                    el["constraint_on_children"](self)):
+                            if self.umr_graph.ud_index.feature_set(self.ud_node).issuperset(el['node.feats']):
                                 value = self.invert_polarity(el["modal-strength"])
 
                 if self.ud_node and not isinstance(self.ud_node, str):
-                    auxiliaries = [c for c in self.ud_node.children if c.deprel == 'aux']
+                    auxiliaries = self.umr_graph.ud_index.children(self.ud_node, deprel='aux')
                     if auxiliaries:
                         values = set()
                         for a in auxiliaries:
                             value_temp, replace = next(
-                                ((el["modal-strength"], el["replace"]) for el in self.umr_graph.modals["lexical"]
-                                 if el["lemma"] == a.lemma
-                                 and el["modal-strength"]
-                                 and (el["constraint"] is None or eval(el["constraint"]))),
+                                ((el["modal-strength"], el["replace"])
+                                 for el in self.umr_graph.modals["lexical"].get(a.lemma, [])
+                                 if el["modal-strength"] and (el["constraint"] is None or el["constraint"](self))),
                                 (None, None)
                             )
                             if value_temp and replace == 'no':
@@ -653,7 +629,7 @@ class UMRNode:
     def mode(self):
         """ Assign mode attribute. """
         value=None
-        punct = [c for c in self.ud_node.children if c.upos == 'PUNCT']
+        punct = self.umr_graph.ud_index.children(self.ud_node, upos='PUNCT')
 
         if self.ud_node.feats['Mood'] == 'Imp':
             value = 'imperative'
@@ -675,7 +651,7 @@ class UMRNode:
 
         if self.ud_node.feats['PronType'] == 'Tot' or self.ud_node.sdeprel in ['nummod', 'numgov']:
             role = self.role if self.role != 'det' else 'quant'
-            cop_siblings = [s for s in self.ud_node.siblings if s.deprel == 'cop']
+            cop_siblings = self.umr_graph.ud_index.siblings(self.ud_node, deprel='cop')
             has_cop_sibling = len(cop_siblings) > 0
 
             if self.ud_node.udeprel == 'det' and not has_cop_sibling:
@@ -686,7 +662,7 @@ class UMRNode:
                 self.add_node(role)
 
         elif self.ud_node.upos == 'DET' and self.ud_node.feats['PronType'] == 'Prs':
-            cop = [c for c in self.ud_node.children if c.deprel == 'cop']
+            cop = self.umr_graph.ud_index.children(self.ud_node, deprel='cop')
             is_adj_noun = self.ud_node.parent.upos in ['ADJ', 'NOUN', 'PROPN'] or len(cop) > 0
             role = 'possessor' if is_adj_noun else self.role
             self.add_node(role)
@@ -746,7 +722,7 @@ class UMRNode:
             if ((self.ud_node.upos == 'DET' and self.ud_node.feats['PronType'] == 'Prs') or
                     (self.ud_node.upos == 'PRON' and self.ud_node.sdeprel == 'poss')):
 
-                cop = [c for c in self.ud_node.children if c.deprel == 'cop']
+                cop = self.umr_graph.ud_index.children(self.ud_node, deprel='cop')
                 is_adj_noun = self.ud_node.parent.upos in ['ADJ', 'NOUN', 'PROPN'] or len(cop) > 0
                 is_reflexive = self.ud_node.lemma in ['suus', 'svůj']  # la, cs
 
@@ -789,7 +765,7 @@ class UMRNode:
         if not self.replaced:
             if self.ud_node.feats['PronType'] == 'Tot':
 
-                cop_siblings = [s for s in self.ud_node.siblings if s.deprel == 'cop']
+                cop_siblings = self.umr_graph.ud_index.siblings(self.ud_node, deprel='cop')
 
                 if self.ud_node.udeprel != 'det' or (self.ud_node.udeprel == 'det' and len(cop_siblings) == 1):
                     self.already_added = True
@@ -826,7 +802,7 @@ class UMRNode:
         """
         if not self.replaced and self.role != 'other':
 
-            names = [c for c in self.ud_node.children if c.udeprel == 'flat']
+            names = self.umr_graph.ud_index.children(self.ud_node, udeprel='flat')
             if self.ud_node.upos == 'PROPN' or (self.ud_node.upos in ['NOUN', 'X'] and names):
 
                 entity = self.create_node('NE-TYPE', self.role, replace=True)
@@ -839,7 +815,7 @@ class UMRNode:
                 name = self.create_node('name', 'name')
                 name.add_node(name.role, def_parent=entity.var_name)
 
-                names = [c for c in self.ud_node.children if c.udeprel == 'flat']
+                names = self.umr_graph.ud_index.children(self.ud_node, udeprel='flat')
                 names = [self] + [UMRNode.find_by_ud_node(self.umr_graph, n)[0] for n in names]
 
                 for i, n in enumerate(names, start=1):
@@ -857,11 +833,11 @@ class UMRNode:
         # create one top node for the conjunction governing the coordination
         if self.ud_node.parent not in self.umr_graph.track_conj:  # node.parent is the head conjunct
             # identify conjunction type (polysyndeton or asyndeton)
-            cc = next((c for c in self.ud_node.children if c.deprel == 'cc'), None)
+            cc = next(iter(self.umr_graph.ud_index.children(self.ud_node, deprel='cc')), None)
             if cc is None:
-                cc = next((c for c in self.ud_node.children if c.deprel == 'punct' and c.lemma == ','), None)
+                cc = next((c for c in self.umr_graph.ud_index.children(self.ud_node, deprel='punct') if c.lemma == ','), None)
             if self.umr_graph.conjs:
-                cord = next((k for k, v in self.umr_graph.conjs.items() if cc and cc.lemma in v), None)
+                cord = self.umr_graph.conjs.get(cc.lemma) if cc else None
             else:
                 cord = None
             if not cord:  # coordination without conjunction/comma
@@ -903,13 +879,11 @@ class UMRNode:
                     parent = UMRNode.find_by_ud_node(self.umr_graph, self.ud_node.parent.parent)[0]
                     conj.parent = parent
 
-                for tup in self.umr_graph.triples:  # avoid clashes of abstract concepts and coordination
-                    if tup[2] == first_conj.var_name:
-                        role, parent = tup[1], tup[0]
-                        break
+                tup = self.umr_graph.triples.first(target=first_conj.var_name)  # avoid clashes of abstract concepts and coordination
+                if tup:
+                    role, parent = tup[1], tup[0]
 
-                self.umr_graph.triples = [tup for tup in self.umr_graph.triples
-                                          if not (tup[0] == parent and tup[1] == role and tup[2] == first_conj.var_name)]
+                self.umr_graph.triples.remove_where(source=parent, role=role, target=first_conj.var_name)
                 if conj.var_name != root_var:
                     self.umr_graph.triples.append((parent, role, conj.var_name))
                 self.umr_graph.track_conj[self.ud_node.parent] = conj.var_name
@@ -925,7 +899,7 @@ class UMRNode:
                     second_conj.already_added = True
 
                 # attach additional conjuncts, if any
-                for i, oc in enumerate((s for s in self.ud_node.siblings if s.deprel == 'conj'), start=3):
+                for i, oc in enumerate(self.umr_graph.ud_index.siblings(self.ud_node, deprel='conj'), start=3):
                     oc_node = UMRNode.find_by_ud_node(self.umr_graph, oc)[0]
                     if not oc_node.already_added:
                         oc_node.role = f'op{i}'
@@ -960,20 +934,20 @@ class UMRNode:
                 concept = 'have-identity-91'
 
         elif self.ud_node.parent.upos == 'ADJ':
-            if parent_case in {'Nom', 'Acc', ''} and not any(s.upos == 'ADP' for s in self.ud_node.siblings):
+            if parent_case in {'Nom', 'Acc', ''} and not self.umr_graph.ud_index.siblings(self.ud_node, upos='ADP'):
                 concept = 'have-mod-91'
 
         elif self.ud_node.parent.upos == 'DET':
             concept = 'belong-91' if parent_feats['PronType'] == 'Prs' else 'identity-91'
 
         elif self.ud_node.parent.upos in {'PRON', 'NOUN', 'PROPN'}:
-            if parent_case in {'Nom', 'Acc', ''} and not any(s.upos == 'ADP' for s in self.ud_node.siblings):
+            if parent_case in {'Nom', 'Acc', ''} and not self.umr_graph.ud_index.siblings(self.ud_node, upos='ADP'):
                 concept = 'identity-91'
             elif parent_case == 'Gen':
                 concept = 'belong-91'
             elif parent_case == 'Dat':
                 # Check for double dative
-                ref_dative = [s for s in self.ud_node.siblings if s.feats.get('Case') == 'Dat' and s.deprel == 'obl:arg']
+                ref_dative = [s for s in self.umr_graph.ud_index.siblings(self.ud_node, deprel='obl:arg') if s.feats['Case'] == 'Dat']
                 concept = 'have-purpose-91' if ref_dative else 'belong-91'
             elif parent_case == 'Loc':
                 concept = 'have-place-91'
@@ -1022,13 +996,12 @@ class UMRNode:
             self.add_node(rel_pron_node.role, invert=True, def_parent=referent)
             rel_pron_node.check_needed = True
 
-        for i, tup in enumerate(self.umr_graph.triples):
-            if tup[1] == 'root-of':  # issues with head of relative being the root
-                # look for other dependants
-                if 'nsubj' in [d.deprel for d in self.ud_node.children]:
-                    self.umr_graph.triples[i] = (tup[0], 'undergoer-of', tup[2])
-                elif 'obj' in [d.deprel for d in self.ud_node.children]:
-                    self.umr_graph.triples[i] = (tup[0], 'actor-of', tup[2])
+        for i, tup in self.umr_graph.triples.items(role='root-of'):  # issues with head of relative being the root
+            # look for other dependants
+            if self.umr_graph.ud_index.children(self.ud_node, deprel='nsubj'):
+                self.umr_graph.triples[i] = (tup[0], 'undergoer-of', tup[2])
+            elif self.umr_graph.ud_index.children(self.ud_node, deprel='obj'):
+                self.umr_graph.triples[i] = (tup[0], 'actor-of', tup[2])
 
     def adverbial_clauses(self):
         """
@@ -1036,37 +1009,28 @@ class UMRNode:
         If a dictionary with disambiguated SCONJs is provided, it is used here to assign more fine-grained relations.
         """
         role = 'ADVCL'
-        sconj = next((c for c in self.ud_node.children if c.deprel == 'mark'), None)
+        sconj = next(iter(self.umr_graph.ud_index.children(self.ud_node, deprel='mark')), None)
 
         if sconj and self.umr_graph.advcl and sconj.lemma in self.umr_graph.advcl:
-            constraint = self.umr_graph.advcl.get(sconj.lemma, {}).get('constraint')
-            if constraint:
-                valid = []
-                for c in constraint:
-                    if c:
-                        feat, value = c.split('=')
-                        valid.append(sconj.parent.feats[feat] == value)
-                if all(valid):
-                    role = self.umr_graph.advcl.get(sconj.lemma, {}).get('type')
-                    polarity = self.umr_graph.advcl.get(sconj.lemma, {}).get('polarity')
-                    if polarity:
-                        self.umr_graph.triples.append((self.var_name, 'polarity', polarity))
-            else:
-                role = self.umr_graph.advcl.get(sconj.lemma, {}).get('type')
-                polarity = self.umr_graph.advcl.get(sconj.lemma, {}).get('polarity')
-                if polarity:
-                    self.umr_graph.triples.append((self.var_name, 'polarity', polarity))
+            # the first sense of the SCONJ whose constraint on the parent features is satisfied.
+            sense = next((s for s in self.umr_graph.advcl[sconj.lemma]
+                          if not s['constraint'] or all(sconj.parent.feats[feat] == value
+                                                        for feat, value in s['constraint'])), None)
+            if sense:
+                role = sense['type']
+                if sense['polarity']:
+                    self.umr_graph.triples.append((self.var_name, 'polarity', sense['polarity']))
 
         if not self.extra_level:
             if not (hasattr(self.ud_node, 'lemma') and (self.umr_graph.modals and
-                                                        [el for el in self.umr_graph.modals["lexical"]
-                                                         if el["lemma"] == self.ud_node.lemma and el["replace"] == "yes"])):
+                                                        any(el["replace"] == "yes" for el in
+                                                            self.umr_graph.modals["lexical"].get(self.ud_node.lemma, [])))):
                 self.role = role
                 self.add_node(self.role)
                 self.aspect()
                 self.modality()
             else:
-                xcomp = [c for c in self.ud_node.children if c.deprel == 'xcomp']
+                xcomp = self.umr_graph.ud_index.children(self.ud_node, deprel='xcomp')
                 if xcomp:
                     self.role = role
                     xcomp = UMRNode.find_by_ud_node(self.umr_graph, xcomp[0])[0]
@@ -1095,7 +1059,7 @@ class UMRNode:
         """ Handle quantities, which are attributes in UMRs. """
 
         number = self.ud_node.form
-        components = [c for c in self.ud_node.children if c.deprel in ['flat', 'compound'] and c.upos == 'NUM']
+        components = [c for c in self.umr_graph.ud_index.children(self.ud_node, upos='NUM') if c.deprel in ['flat', 'compound']]
         components = [UMRNode.find_by_ud_node(self.umr_graph, c)[0] for c in components]
         if components:
             for c in components:
@@ -1106,7 +1070,7 @@ class UMRNode:
                 c.already_added = True
 
         if self.ud_node.upos == 'NUM':
-            digit = translate_number(number, self.lang)
+            digit = translate_number(number, self.umr_graph.lang)
             if isinstance(digit, int) or is_number(digit):
                 self.umr_graph.triples.append((self.parent.var_name, 'quant', digit))
             else:
@@ -1144,7 +1108,7 @@ class UMRNode:
                 degree_node = self.create_node(umr_degree, 'ARG3')
                 self.add_node(self.role)
                 self.umr_graph.triples.extend([
-                    pm.invert((concept.var_name, 'ARG2', self.var_name)),
+                    invert_triple((concept.var_name, 'ARG2', self.var_name)),
                     (concept.var_name, degree_node.role, degree_node.var_name),
                 ])
                 self.parent, self.parent.parent = concept, concept
@@ -1153,7 +1117,7 @@ class UMRNode:
                 concept.modality()
 
             elif head:
-                cop = [c for c in self.ud_node.children if c.deprel == 'cop']
+                cop = self.umr_graph.ud_index.children(self.ud_node, deprel='cop')
                 if cop:
                     cop_node = UMRNode.find_by_ud_node(self.umr_graph, cop[0])[0]
                     have_degree = cop_node.replace_with_abstract_roleset('have-degree-91', relaxed=True)
@@ -1173,7 +1137,7 @@ class UMRNode:
                 self.already_added = True
 
             if any([modifier, adverb, head, rebuild]):
-                cmp = [c for c in self.ud_node.children if c.deprel == 'obl:cmp']
+                cmp = self.umr_graph.ud_index.children(self.ud_node, deprel='obl:cmp')
                 if cmp:
                     cmp_node = UMRNode.find_by_ud_node(self.umr_graph, cmp[0])[0]
                     cmp_node.role = 'ARG4'
@@ -1197,12 +1161,11 @@ class UMRNode:
 
         # E.g., for English phrasal verbs or Czech reflexives
         if self.ud_node.sdeprel in ['prt', 'pv'] or (self.parent.ud_node and self.parent.ud_node.upos in ['VERB', 'ADJ', 'ADV']):
-            for i, tup in enumerate(self.umr_graph.triples):
-                if tup[0] == self.parent.var_name and tup[1] == 'instance':
-                    if self.parent.ud_node.upos == 'ADJ':
-                        self.umr_graph.triples[i] = (tup[0], tup[1], self.ud_node.lemma + '-' + self.parent.ud_node.lemma)
-                    else:
-                        self.umr_graph.triples[i] = (tup[0], tup[1], self.parent.ud_node.lemma + '-' + self.ud_node.lemma)
+            for i, tup in self.umr_graph.triples.items(source=self.parent.var_name, role='instance'):
+                if self.parent.ud_node.upos == 'ADJ':
+                    self.umr_graph.triples[i] = (tup[0], tup[1], self.ud_node.lemma + '-' + self.parent.ud_node.lemma)
+                else:
+                    self.umr_graph.triples[i] = (tup[0], tup[1], self.parent.ud_node.lemma + '-' + self.ud_node.lemma)
             self.already_added = True
 
         if self.parent.ud_node and self.parent.ud_node.upos == 'NOUN':
@@ -1217,10 +1180,8 @@ class UMRNode:
         For example, adpositions are not converted.
         """
         if self.ud_node.parent.deprel in ['advmod', 'obl']:
-            for i, tup in enumerate(self.umr_graph.triples):
-                if tup[0] == self.parent.var_name and tup[1] == 'instance':
-
-                    self.umr_graph.triples[i] = (tup[0], tup[1], self.parent.ud_node.lemma + '-' + self.ud_node.lemma)
+            for i, tup in self.umr_graph.triples.items(source=self.parent.var_name, role='instance'):
+                self.umr_graph.triples[i] = (tup[0], tup[1], self.parent.ud_node.lemma + '-' + self.ud_node.lemma)
             self.already_added = True
 
     def hidden_event(self):
@@ -1235,10 +1196,50 @@ class UMRNode:
             self.modality('full-affirmative')
             self.aspect('performance')
 
-            for i, tup in enumerate(self.umr_graph.triples):
+            for i, tup in self.umr_graph.triples.items(source=self.var_name):
                 # Replace adjectival concept with verbal concept
-                if tup[0] == self.var_name and tup[1] == 'instance':
+                if tup[1] == 'instance':
                     self.umr_graph.triples[i] = (tup[0], tup[1], self.ud_node.misc['LDeriv'])
                 # Dependents are not assigned a 'mod' relation but an 'OBLIQUE' one.
-                if tup[0] == self.var_name and tup[1] == 'mod':
+                if tup[1] == 'mod':
                     self.umr_graph.triples[i] = (tup[0], 'OBLIQUE', tup[2])
+
+
+# Rules of UMRNode.ud_to_umr(), in order of priority. Tests look at (upos, deprel, udeprel, sdeprel); guards at the
+# UMRNode itself.
+UPOS_RULES = (
+    Rule('PRON', lambda upos, deprel, udeprel, sdeprel: upos == 'PRON', UMRNode.mark_entity),
+    Rule('DET', lambda upos, deprel, udeprel, sdeprel: upos == 'DET', UMRNode.determiners_initial),
+    Rule('ADJ', lambda upos, deprel, udeprel, sdeprel: upos == 'ADJ', UMRNode.hidden_event),
+    Rule('VERB', lambda upos, deprel, udeprel, sdeprel: upos == 'VERB', UMRNode.predicates),
+    Rule('PROPN', lambda upos, deprel, udeprel, sdeprel: upos == 'PROPN', UMRNode.mark_entity),
+    Rule('degree', lambda upos, deprel, udeprel, sdeprel: upos in ['ADJ', 'ADV'], UMRNode.degree,
+         guard=lambda n: n.ud_node.feats['Degree']),
+)
+
+DEPREL_RULES = (
+    Rule('quantities', lambda upos, deprel, udeprel, sdeprel: udeprel == 'nummod' or sdeprel in ['nummod', 'numgov'],
+         UMRNode.quantities),
+    Rule('coordination', lambda upos, deprel, udeprel, sdeprel: deprel == 'conj', UMRNode.conjuncts),
+    Rule('clauses', lambda upos, deprel, udeprel, sdeprel: udeprel in ['csubj', 'ccomp', 'xcomp'], UMRNode.clauses),
+    Rule('nmod', lambda upos, deprel, udeprel, sdeprel: deprel == 'nmod', UMRNode.nominal_modifiers),
+    Rule('appos', lambda upos, deprel, udeprel, sdeprel: deprel == 'appos',
+         lambda n: n.introduce_abstract_roleset(n.role)),
+    Rule('copulas', lambda upos, deprel, udeprel, sdeprel: deprel == 'cop', UMRNode.copulas),
+    # copular constructions with no overt copula
+    Rule('copulas (no cop)', lambda upos, deprel, udeprel, sdeprel: deprel == 'nsubj',
+         lambda n: n.copulas(copula=False),
+         guard=lambda n: n.ud_node.parent.upos != 'VERB' and not n.umr_graph.ud_index.siblings(n.ud_node, deprel='cop')),
+    Rule('relative clauses', lambda upos, deprel, udeprel, sdeprel: deprel == 'acl:relcl', UMRNode.relative_clause_heads),
+    Rule('acl', lambda upos, deprel, udeprel, sdeprel: deprel == 'acl', UMRNode.acl_participles),
+    Rule('adverbial clauses', lambda upos, deprel, udeprel, sdeprel: udeprel == 'advcl', UMRNode.adverbial_clauses),
+    Rule('compound', lambda upos, deprel, udeprel, sdeprel: udeprel == 'compound' or deprel == 'expl:pv',
+         UMRNode.compound),
+    Rule('fixed', lambda upos, deprel, udeprel, sdeprel: udeprel == 'fixed', UMRNode.fixed),
+    Rule('flat', lambda upos, deprel, udeprel, sdeprel: udeprel == 'flat', lambda n: n.parent.named_entities()),
+)
+
+BY_UPOS, BY_DEPREL = 0, 1
+
+# Shared by all UMRGraphs, so that candidate rules are compiled once per (upos, deprel) pair.
+DISPATCHER = RuleDispatcher(UPOS_RULES, DEPREL_RULES)
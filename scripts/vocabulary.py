@@ -0,0 +1,100 @@
+import sys
+
+# Roles whose target is always a constant.
+ATTRIBUTE_ROLES = ('mode', 'modal-strength', 'aspect', 'refer-number', 'refer-person')
+
+# Order of roles within a node, reflecting a natural order of manual annotation (see umr_graph.reorder_triples).
+ROLE_PRIORITY = ('instance', 'actor', 'experiencer', 'undergoer', 'theme', 'stimulus', 'ARG1', 'ARG2', 'ARG3', 'ARG4',
+                 'affectee', 'OBLIQUE', 'manner', 'mod', 'op1', 'op2', 'op3', 'op4', 'op5', 'refer-person',
+                 'refer-number', 'modal-predicate', 'modal-strength', 'aspect', 'quot')
+
+# Roles that are not checked for an inverted duplicate (see umr_graph.UMRGraph.has_inverted_duplicate).
+NON_INVERTIBLE_ROLES = ('other', 'refer-number', 'refer-person', 'aspect', 'instance', 'mode', 'modal-strength')
+
+
+class Role:
+    __slots__ = ('name', 'is_inverted', 'inverse', 'kind', 'priority', 'invertible')
+
+    def __init__(self, name):
+        """
+        The precomputed properties of a role, so that they are looked up instead of being derived from its name.
+
+        Attributes:
+            self.name (str): The interned name of the role, e.g. 'ARG1-of'.
+            self.is_inverted (bool): Whether the role is inverted, i.e. ends with '-of'.
+            self.inverse (str): The interned name of the inverse role ('ARG1' <-> 'ARG1-of').
+            self.kind (str): 'instance', 'attribute', 'relation', or 'quantity' for roles (quant, op*) whose target
+                can be either a constant or a variable.
+            self.priority (float): The rank of the role in ROLE_PRIORITY, or infinity.
+            self.invertible (bool): Whether the role is subject to the removal of inverted duplicates.
+        """
+        self.name = name
+        if name is None:
+            self.is_inverted, self.inverse, self.kind, self.invertible = False, None, 'relation', False
+        else:
+            self.is_inverted = name.endswith('-of')
+            self.inverse = sys.intern(name[:-3] if self.is_inverted else f'{name}-of')
+            if name == 'instance':
+                self.kind = 'instance'
+            elif name in ATTRIBUTE_ROLES:
+                self.kind = 'attribute'
+            elif name == 'quant' or name.startswith('op'):
+                self.kind = 'quantity'
+            else:
+                self.kind = 'relation'
+            self.invertible = bool(name) and name not in NON_INVERTIBLE_ROLES and not self.is_inverted
+        self.priority = ROLE_PRIORITY.index(name) if name in ROLE_PRIORITY else float('inf')
+
+    def __repr__(self):
+        return f"Role({self.name!r})"
+
+
+class Vocabulary:
+    def __init__(self, names=()):
+        """
+        Interns the roles used in UMR triples: each distinct role gets a Role record, computed on first use. Role names
+        are interned strings, so that equal roles are also identical objects.
+
+        Attributes:
+            self.by_name (dict): name -> Role.
+        """
+        self.by_name = {}
+        for name in names:
+            self[name]
+
+    def __len__(self):
+        return len(self.by_name)
+
+    def __contains__(self, name):
+        return name in self.by_name
+
+    def __getitem__(self, name) -> Role:
+        role = self.by_name.get(name)
+        if role is None:
+            if name is not None:
+                name = sys.intern(name)
+            role = self.by_name[name] = Role(name)
+        return role
+
+
+ROLES = Vocabulary(ROLE_PRIORITY)
+
+
+def invert_triple(triple):
+    """ Inverts (or de-inverts) a triple: (a, role, b) <-> (b, role-of, a). """
+    source, role, target = triple
+    return target, ROLES[role].inverse, source
+
+
+def type_of_triple(triple):
+    """
+    Returns the type of the edge in the triple, which can be 'instance', 'attribute', 'relation'.
+    """
+    parent, edge, child = triple
+    kind = ROLES[edge].kind
+    if kind == 'quantity':
+        # child is a variable or a constant?
+        if isinstance(child, int) or (child.startswith('"') and child.endswith('"')):
+            return 'attribute'
+        return 'relation'
+    return kind